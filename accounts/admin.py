@@ -1,7 +1,7 @@
 # accounts/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, OTP
+from .models import User, OTP, OTPDelivery
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -13,3 +13,8 @@ class UserAdmin(BaseUserAdmin):
 class OTPAdmin(admin.ModelAdmin):
     list_display = ('user','otp','purpose','is_used','expires_at','created_at')
     list_filter = ('purpose','is_used')
+
+@admin.register(OTPDelivery)
+class OTPDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('user','purpose','status','attempts','next_attempt_at','sent_at')
+    list_filter = ('status','purpose')
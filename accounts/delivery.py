@@ -0,0 +1,80 @@
+# accounts/delivery.py
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import OTPDelivery
+from .senders import get_otp_sender
+
+logger = logging.getLogger(__name__)
+
+def backoff(attempts):
+    """Exponential backoff with jitter for the given number of failed attempts."""
+    base = settings.OTP_DELIVERY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=base * random.uniform(0.5, 1.5))
+
+def claim_batch(batch_size):
+    """
+    Lease up to `batch_size` due deliveries by pushing their next attempt
+    past the lease window, so concurrent workers do not pick them up too.
+    Deliveries whose code has expired are marked failed instead of sent.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        OTPDelivery.objects.filter(status='pending', expires_at__lte=now).update(
+            status='failed', last_error='expired before delivery'
+        )
+        batch = list(
+            OTPDelivery.objects.select_for_update(skip_locked=True)
+            .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now), status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        OTPDelivery.objects.filter(id__in=[d.id for d in batch]).update(
+            next_attempt_at=now + timedelta(seconds=settings.OTP_DELIVERY_LEASE_SECONDS)
+        )
+    return batch
+
+def _send(sender, delivery):
+    try:
+        sender.send(delivery)
+        return None
+    except Exception as exc:
+        logger.warning("OTP delivery %s failed: %s", delivery.id, exc)
+        return str(exc) or exc.__class__.__name__
+    finally:
+        close_old_connections()
+
+def deliver_pending(batch_size=100, workers=8, sender=None):
+    """
+    Send one batch of due OTP messages on a thread pool and record the
+    outcome with a single bulk_update. Returns (sent, failed) counts.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+    sender = sender or get_otp_sender()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = list(pool.map(lambda d: _send(sender, d), batch))
+
+    now = timezone.now()
+    sent = failed = 0
+    for delivery, error in zip(batch, errors):
+        delivery.attempts += 1
+        if error is None:
+            delivery.status, delivery.sent_at, delivery.last_error = 'sent', now, ''
+            sent += 1
+            continue
+        failed += 1
+        delivery.last_error = error
+        if delivery.attempts >= settings.OTP_DELIVERY_MAX_ATTEMPTS:
+            delivery.status = 'failed'
+        else:
+            delivery.next_attempt_at = now + backoff(delivery.attempts)
+    OTPDelivery.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return sent, failed
@@ -0,0 +1,26 @@
+# accounts/management/commands/deliver_otps.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.delivery import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Drain the OTP outbox: send due messages in batches, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent sends per batch.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--once', action='store_true', help="Process what is due now and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_pending(options['batch_size'], options['workers'])
+            if sent or failed:
+                self.stdout.write(f"sent={sent} failed={failed}")
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,36 @@
+# accounts/management/commands/purge_expired_otps.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import OTP, OTPDelivery
+
+
+class Command(BaseCommand):
+    help = "Delete expired or used OTPs and finished outbox rows, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--keep-deliveries-hours', type=int, default=24)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        otps = self.purge(OTP.objects.filter(Q(expires_at__lt=now) | Q(is_used=True)), options['chunk_size'])
+        deliveries = self.purge(
+            OTPDelivery.objects.filter(
+                status__in=['sent', 'failed'],
+                created_at__lt=now - timedelta(hours=options['keep_deliveries_hours']),
+            ),
+            options['chunk_size'],
+        )
+        self.stdout.write(f"Purged {otps} OTP(s) and {deliveries} delivery record(s).")
+
+    def purge(self, queryset, chunk_size):
+        total = 0
+        while True:
+            ids = list(queryset.values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                return total
+            total += queryset.model.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_phone_alter_user_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otp',
+            index=models.Index(fields=['user', 'otp', 'is_used', 'expires_at'], name='otp_lookup_idx'),
+        ),
+    ]
@@ -24,8 +24,44 @@ class OTP(models.Model):
     expires_at = models.DateTimeField()
     is_used = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # VerifyOTPView / ResetPasswordView lookup
+            models.Index(fields=['user', 'otp', 'is_used', 'expires_at'], name='otp_lookup_idx'),
+        ]
+
     def is_expired(self):
         return timezone.now() > self.expires_at
 
     def __str__(self):
-        return f'OTP({self.user},{self.otp}, {self.purpose}, used={self.is_used})'
\ No newline at end of file
+        return f'OTP({self.user},{self.otp}, {self.purpose}, used={self.is_used})'
+
+class OTPDelivery(models.Model):
+    """
+    Outbox row for an OTP message, written in the same transaction as the
+    OTP and sent later by the `deliver_otps` worker.
+    """
+    STATUS_CHOICES = (
+        ('pending','pending'),
+        ('sent','sent'),
+        ('failed','failed'),
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='otp_deliveries')
+    purpose = models.CharField(max_length=20, choices=OTP.PURPOSE_CHOICES, default='signup')
+    code = models.CharField(max_length=6)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Same as the OTP's; an expired code is never sent
+    expires_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='otp_delivery_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'OTPDelivery({self.user}, {self.purpose}, {self.status}, attempts={self.attempts})'
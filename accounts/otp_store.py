@@ -0,0 +1,78 @@
+# accounts/otp_store.py
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import OTP
+
+class OTPRateLimited(Exception):
+    pass
+
+def _hit(action, user, purpose, limit):
+    """Count one attempt in a fixed window; raise once `limit` is exceeded."""
+    cache = caches[settings.OTP_CACHE_ALIAS]
+    key = f"otp-rate:{action}:{purpose}:{user.pk}"
+    cache.add(key, 0, settings.OTP_RATE_WINDOW_SECONDS)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, settings.OTP_RATE_WINDOW_SECONDS)
+        count = 1
+    if count > limit:
+        raise OTPRateLimited(f"Too many OTP {action} attempts for {purpose}.")
+
+class BaseOTPStore:
+    """
+    Issues and checks one-time codes. `verify` consumes the code in the
+    same operation that checks it, so a code can only ever be used once.
+    """
+
+    def issue(self, user, purpose, code, expiry_minutes):
+        _hit('issue', user, purpose, settings.OTP_ISSUE_LIMIT)
+        self.save(user, purpose, code, timedelta(minutes=expiry_minutes))
+
+    def verify(self, user, purpose, code):
+        _hit('verify', user, purpose, settings.OTP_VERIFY_LIMIT)
+        return self.consume(user, purpose, code)
+
+    def save(self, user, purpose, code, ttl):
+        raise NotImplementedError
+
+    def consume(self, user, purpose, code):
+        raise NotImplementedError
+
+class CacheOTPStore(BaseOTPStore):
+    """
+    Codes live only in the cache and expire with it. The code is part of
+    the key, so checking and consuming is a single atomic delete. Needs a
+    cache shared by every worker (Redis, Memcached, database cache).
+    """
+
+    def key(self, user, purpose, code):
+        return f"otp:{purpose}:{user.pk}:{code}"
+
+    def save(self, user, purpose, code, ttl):
+        caches[settings.OTP_CACHE_ALIAS].set(self.key(user, purpose, code), 1, int(ttl.total_seconds()))
+
+    def consume(self, user, purpose, code):
+        return caches[settings.OTP_CACHE_ALIAS].delete(self.key(user, purpose, code))
+
+class DatabaseOTPStore(BaseOTPStore):
+    """
+    Codes in the OTP table. Verification is one conditional UPDATE on the
+    (user, otp, is_used, expires_at) index; `purge_expired_otps` keeps the
+    table bounded.
+    """
+
+    def save(self, user, purpose, code, ttl):
+        OTP.objects.create(user=user, otp=code, purpose=purpose, expires_at=timezone.now() + ttl)
+
+    def consume(self, user, purpose, code):
+        return bool(OTP.objects.filter(
+            user=user, otp=code, purpose=purpose, is_used=False, expires_at__gte=timezone.now()
+        ).update(is_used=True))
+
+def get_otp_store():
+    return import_string(settings.OTP_STORE)()
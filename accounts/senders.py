@@ -0,0 +1,29 @@
+# accounts/senders.py
+import logging
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+class BaseOTPSender:
+    """Delivers one OTP message. Raise any exception to have the worker retry."""
+
+    def send(self, delivery):
+        raise NotImplementedError
+
+class ConsoleOTPSender(BaseOTPSender):
+    """Logs the message instead of sending it; the code itself only with DEBUG on."""
+
+    def send(self, delivery):
+        code = delivery.code if settings.DEBUG else '*' * len(delivery.code)
+        logger.info("OTP for user %s purpose %s: %s", delivery.user_id, delivery.purpose, code)
+
+class LocmemOTPSender(BaseOTPSender):
+    """Keeps sent messages in memory, for tests."""
+    outbox = []
+
+    def send(self, delivery):
+        LocmemOTPSender.outbox.append(delivery)
+
+def get_otp_sender():
+    return import_string(settings.OTP_SENDER)()
@@ -0,0 +1,10 @@
+# accounts/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.authentication import invalidate_user
+from .models import User
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Password changes, deactivation and profile edits must not be served stale
+    invalidate_user(instance.pk)
@@ -1,3 +1,237 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .delivery import deliver_pending
+from .models import OTP, OTPDelivery, User
+from .senders import BaseOTPSender, ConsoleOTPSender, LocmemOTPSender
+from .throttling import AuthUsernameThrottle, rejection_stats
+from .views import LoginView
+
+
+class FlakySender(BaseOTPSender):
+    def send(self, delivery):
+        raise ConnectionError("provider timed out")
+
+
+@override_settings(OTP_SENDER='accounts.senders.LocmemOTPSender')
+class OTPDeliveryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        LocmemOTPSender.outbox.clear()
+
+    def signup(self):
+        return self.client.post('/api/accounts/signup/', {
+            'username': 'newbie', 'email': 'newbie@example.com',
+            'password': 'S3cure-pass!', 'confirm_password': 'S3cure-pass!',
+        })
+
+    def test_signup_queues_instead_of_sending(self):
+        response = self.signup()
+        self.assertEqual(response.status_code, 201)
+        delivery = OTPDelivery.objects.get()
+        self.assertEqual(delivery.status, 'pending')
+        self.assertEqual(delivery.code, response.data['otp_debug'])
+        self.assertEqual(LocmemOTPSender.outbox, [])
+
+        self.assertEqual(deliver_pending(), (1, 0))
+        self.assertEqual([d.code for d in LocmemOTPSender.outbox], [delivery.code])
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), ('sent', 1))
+        self.assertEqual(deliver_pending(), (0, 0))
+
+    @override_settings(OTP_DELIVERY_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_give_up(self):
+        self.signup()
+        self.assertEqual(deliver_pending(sender=FlakySender()), (0, 1))
+        delivery = OTPDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.attempts), ('pending', 1))
+        self.assertGreater(delivery.next_attempt_at, timezone.now())
+        self.assertIn('timed out', delivery.last_error)
+
+        # Not due yet
+        self.assertEqual(deliver_pending(sender=FlakySender()), (0, 0))
+
+        OTPDelivery.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(deliver_pending(sender=FlakySender()), (0, 1))
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), ('failed', 2))
+
+    def test_expired_codes_are_not_sent(self):
+        self.signup()
+        OTPDelivery.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(deliver_pending(), (0, 0))
+        self.assertEqual(LocmemOTPSender.outbox, [])
+        delivery = OTPDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.last_error), ('failed', 'expired before delivery'))
+
+    def test_console_sender_logs_masked_code(self):
+        delivery = OTPDelivery(user_id=1, purpose='signup', code='123456')
+        with self.assertLogs('accounts.senders', 'INFO') as logs:
+            ConsoleOTPSender().send(delivery)
+        self.assertIn('******', logs.output[0])
+        self.assertNotIn('123456', logs.output[0])
+
+
+class OTPStoreTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='otpuser', email='otpuser@example.com', password='pass12345')
+        self.user.is_active = False
+        self.user.save()
+
+    def request_otp(self):
+        return self.client.post('/api/accounts/resend-otp/', {'email': self.user.email})
+
+    def verify(self, code):
+        return self.client.post('/api/accounts/verify-otp/', {'email': self.user.email, 'otp': code})
+
+    def check_single_use(self):
+        code = self.request_otp().data['otp_debug']
+        self.assertEqual(self.verify('000000').status_code, 400)
+        self.assertEqual(self.verify(code).status_code, 200)
+        self.assertEqual(self.verify(code).status_code, 400)
+
+    def test_database_store_consumes_once(self):
+        self.check_single_use()
+        self.assertTrue(OTP.objects.get().is_used)
+
+    @override_settings(OTP_STORE='accounts.otp_store.CacheOTPStore')
+    def test_cache_store_consumes_once_without_otp_rows(self):
+        self.check_single_use()
+        self.assertFalse(OTP.objects.exists())
+
+    def test_forgot_code_does_not_verify_signup(self):
+        code = self.client.post('/api/accounts/forgot-password/', {'email': self.user.email}).data['otp_debug']
+        self.assertEqual(self.verify(code).status_code, 400)
+
+    @override_settings(OTP_ISSUE_LIMIT=2, OTP_VERIFY_LIMIT=3)
+    def test_rate_limits_per_user_and_purpose(self):
+        self.assertEqual(self.request_otp().status_code, 200)
+        self.assertEqual(self.request_otp().status_code, 200)
+        self.assertEqual(self.request_otp().status_code, 429)
+        # A different purpose has its own budget
+        self.assertEqual(
+            self.client.post('/api/accounts/forgot-password/', {'email': self.user.email}).status_code, 200
+        )
+        for _ in range(3):
+            self.assertEqual(self.verify('000000').status_code, 400)
+        self.assertEqual(self.verify('000000').status_code, 429)
+
+    def test_purge_removes_used_and_expired(self):
+        now = timezone.now()
+        OTP.objects.create(user=self.user, otp='111111', expires_at=now - timedelta(minutes=1))
+        OTP.objects.create(user=self.user, otp='222222', expires_at=now + timedelta(minutes=5), is_used=True)
+        live = OTP.objects.create(user=self.user, otp='333333', expires_at=now + timedelta(minutes=5))
+        call_command('purge_expired_otps', stdout=StringIO())
+        self.assertEqual(list(OTP.objects.values_list('id', flat=True)), [live.id])
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cached', email='cached@example.com', password='pass12345')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def user_queries(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        return response, [q['sql'] for q in queries if '"accounts_user"' in q['sql']]
+
+    def test_user_is_loaded_once_then_cached(self):
+        response, first = self.user_queries('/api/orders/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(first), 1)
+        response, second = self.user_queries('/api/orders/orders/')
+        self.assertEqual((response.status_code, second), (200, []))
+
+    def test_deactivation_invalidates_cache(self):
+        self.user_queries('/api/orders/orders/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/orders/orders/').status_code, 401)
+
+    def test_claims_only_action_skips_user_lookup(self):
+        response, queries = self.user_queries('/api/products/cart/summary/')
+        self.assertEqual((response.status_code, queries), (200, []))
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        self.user_queries('/api/orders/orders/')
+        self.assertEqual(len(self.user_queries('/api/orders/orders/')[1]), 1)
+
+
+@override_settings(AUTH_THROTTLE_IP_RATE='', AUTH_THROTTLE_USERNAME_RATE='3/min')
+class AuthThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def login(self, username, ip='10.0.0.1'):
+        return self.client.post(
+            '/api/accounts/login/', {'username': username, 'password': 'wrong'}, REMOTE_ADDR=ip
+        )
+
+    def test_username_limit_rejects_before_hashing(self):
+        with patch('accounts.views.authenticate', return_value=None) as check:
+            statuses = [self.login('victim', ip=f'10.0.0.{i}').status_code for i in range(5)]
+            self.assertEqual(statuses, [401, 401, 401, 429, 429])
+            self.assertEqual(check.call_count, 3)
+            self.assertEqual(self.login('someone-else').status_code, 401)
+        self.assertIn('Retry-After', self.login('VICTIM '))
+        self.assertGreaterEqual(rejection_stats()['auth_username:LoginView'], 3)
+
+    @override_settings(AUTH_THROTTLE_IP_RATE='2/min', AUTH_THROTTLE_USERNAME_RATE='')
+    def test_ip_limit_spans_usernames_but_not_endpoints(self):
+        self.assertEqual([self.login(f'user{i}').status_code for i in range(3)], [401, 401, 429])
+        self.assertEqual(self.login('user9', ip='10.0.0.2').status_code, 401)
+        response = self.client.post('/api/accounts/forgot-password/', {'email': 'x@example.com'}, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(AUTH_THROTTLE_IP_RATE='2/min', AUTH_THROTTLE_USERNAME_RATE='')
+    def test_ip_limit_ignores_spoofed_forwarded_for(self):
+        statuses = [
+            self.client.post(
+                '/api/accounts/login/', {'username': f'user{i}', 'password': 'wrong'},
+                REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}',
+            ).status_code
+            for i in range(3)
+        ]
+        self.assertEqual(statuses, [401, 401, 429])
+
+    def test_behind_a_proxy_only_its_hop_is_trusted(self):
+        rest_framework = dict(settings.REST_FRAMEWORK, NUM_PROXIES=1)
+        with override_settings(
+            AUTH_THROTTLE_IP_RATE='2/min', AUTH_THROTTLE_USERNAME_RATE='', REST_FRAMEWORK=rest_framework
+        ):
+            statuses = [
+                self.client.post(
+                    '/api/accounts/login/', {'username': f'user{i}', 'password': 'wrong'},
+                    REMOTE_ADDR='10.0.0.254', HTTP_X_FORWARDED_FOR=f'198.51.100.{i}, 203.0.113.7',
+                ).status_code
+                for i in range(3)
+            ]
+        self.assertEqual(statuses, [401, 401, 429])
+
+    def test_window_slides_across_the_boundary(self):
+        view = LoginView()
+        request = APIRequestFactory().post('/api/accounts/login/', {'username': 'slider'}, format='json')
+        request = view.initialize_request(request)
+        with override_settings(AUTH_THROTTLE_USERNAME_RATE='10/min'):
+            def allowed(at):
+                with patch.object(AuthUsernameThrottle, 'timer', return_value=at):
+                    return AuthUsernameThrottle().allow_request(request, view)
+
+            self.assertTrue(all(allowed(60_000 + 59) for _ in range(10)))
+            # A fixed window would reset here; most of the last minute still counts
+            self.assertFalse(allowed(60_060 + 1))
+            self.assertTrue(allowed(60_060 + 55))
@@ -0,0 +1,116 @@
+# accounts/throttling.py
+import hashlib
+import logging
+import threading
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+from core.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+_rejections = Counter()
+_rejections_lock = threading.Lock()
+
+def rejection_stats():
+    """Throttled requests per "<scope>:<view>" since process start."""
+    with _rejections_lock:
+        return dict(_rejections)
+
+def collect_metrics():
+    samples = []
+    for name, count in sorted(rejection_stats().items()):
+        scope, view = name.split(':', 1)
+        samples.append(({'scope': scope, 'view': view}, count))
+    return [counter('auth_throttle_rejections_total', 'Requests rejected by auth throttles.', samples)]
+
+def _record_rejection(scope, view):
+    name = f"{scope}:{view.__class__.__name__}"
+    with _rejections_lock:
+        _rejections[name] += 1
+    logger.info("Throttled %s", name)
+
+def _incr(cache, key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, timeout)
+        return 1
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Sliding-window limit built from two fixed-window counters: the
+    previous window's count is weighted by how much of it still overlaps
+    the sliding window. Each check is one atomic add+incr and one get, so
+    it stays correct across workers on a shared cache and never stores
+    per-request timestamps. Each view gets its own budget.
+    """
+    rate_setting = None
+
+    def __init__(self):
+        self.cache = caches[settings.AUTH_THROTTLE_CACHE_ALIAS]
+        super().__init__()
+
+    def get_rate(self):
+        return getattr(settings, self.rate_setting) or None
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_value(request)
+        if not ident:
+            return None
+        digest = hashlib.sha256(ident.encode()).hexdigest()[:32]
+        return f"throttle:{self.scope}:{view.__class__.__name__}:{digest}"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        elapsed = now - window * self.duration
+        current = _incr(self.cache, f"{key}:{window}", self.duration * 2)
+        previous = self.cache.get(f"{key}:{window - 1}", 0)
+        estimate = previous * (1 - elapsed / self.duration) + current
+        if estimate <= self.num_requests:
+            return True
+
+        remaining = self.duration - elapsed
+        if current <= self.num_requests and previous:
+            # The overlap with the previous window decays linearly
+            remaining = min(remaining, (estimate - self.num_requests) * self.duration / previous)
+        self.wait_seconds = remaining
+        _record_rejection(self.scope, view)
+        return False
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+class AuthIPThrottle(SlidingWindowThrottle):
+    scope = 'auth_ip'
+    rate_setting = 'AUTH_THROTTLE_IP_RATE'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+class AuthUsernameThrottle(SlidingWindowThrottle):
+    """Keyed on the submitted username or email, so one account cannot be sprayed from many IPs."""
+    scope = 'auth_username'
+    rate_setting = 'AUTH_THROTTLE_USERNAME_RATE'
+
+    def get_ident_value(self, request):
+        try:
+            value = request.data.get('username') or request.data.get('email')
+        except AttributeError:
+            return None
+        return str(value).strip().lower() if value else None
+
+AUTH_THROTTLES = [AuthIPThrottle, AuthUsernameThrottle]
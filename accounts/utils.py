@@ -1,16 +1,24 @@
 # accounts/utils.py
 import random
 from datetime import timedelta
+from django.db import transaction
 from django.utils import timezone
-from .models import OTP
+from .models import OTPDelivery
+from .otp_store import get_otp_store
 
 def generate_otp_code():
     return f"{random.randint(100000, 999999)}"
 
 def create_and_send_otp(user, purpose='signup', expiry_minutes=10):
-    otp = generate_otp_code()
-    now = timezone.now()
-    otp = OTP.objects.create(user=user, otp=otp, purpose=purpose, expires_at=now + timedelta(minutes=expiry_minutes))
-    # TODO: replace with SMS provider in prod (Twilio, Fast2SMS, etc.)
-    print(f"[DEBUG] OTP for user {user} purpose {purpose}: {otp}")
-    return otp
+    """
+    Issue an OTP and queue it for delivery; returns the code. Sending
+    happens in the `deliver_otps` worker, so the request never waits on the
+    provider. Raises OTPRateLimited when the user asks too often.
+    """
+    code = generate_otp_code()
+    with transaction.atomic():
+        get_otp_store().issue(user, purpose, code, expiry_minutes)
+        OTPDelivery.objects.create(
+            user=user, purpose=purpose, code=code, expires_at=timezone.now() + timedelta(minutes=expiry_minutes)
+        )
+    return code
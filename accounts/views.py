@@ -2,7 +2,6 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from .serializers import (
@@ -10,9 +9,14 @@ from .serializers import (
     LoginSerializer, ForgotPasswordSerializer, ResetPasswordSerializer,
     ChangePasswordSerializer,
 )
-from .models import User, OTP
+from .models import User
+from .otp_store import get_otp_store, OTPRateLimited
+from .throttling import AUTH_THROTTLES
 from .utils import create_and_send_otp
 
+def rate_limited_response():
+    return Response({"detail": "Too many OTP requests. Try again later."}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
 class SignupView(APIView):
     permission_classes = [permissions.AllowAny]
     
@@ -23,7 +27,7 @@ class SignupView(APIView):
             otp = create_and_send_otp(user, purpose='signup')
             return Response({
                 "detail": "User created. OTP sent.", 
-                "otp_debug": otp.otp
+                "otp_debug": otp
             }, status=status.HTTP_201_CREATED)
         else:
             # Return detailed validation errors
@@ -34,6 +38,7 @@ class SignupView(APIView):
 
 class VerifyOTPView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = AUTH_THROTTLES
     
     def post(self, request):
         serializer = VerifyOTPSerializer(data=request.data)
@@ -45,14 +50,13 @@ class VerifyOTPView(APIView):
             except User.DoesNotExist:
                 return Response({"detail": "User not found"}, status=status.HTTP_404_NOT_FOUND)
             
-            now = timezone.now()
-            otp_qs = OTP.objects.filter(user=user, otp=otp_code, is_used=False, expires_at__gte=now)
-            if not otp_qs.exists():
+            try:
+                verified = get_otp_store().verify(user, 'signup', otp_code)
+            except OTPRateLimited:
+                return rate_limited_response()
+            if not verified:
                 return Response({"detail": "Invalid or expired OTP"}, status=status.HTTP_400_BAD_REQUEST)
             
-            otp = otp_qs.latest('created_at')
-            otp.is_used = True
-            otp.save()
             user.is_active = True
             user.is_verified = True
             user.save()
@@ -74,6 +78,7 @@ class VerifyOTPView(APIView):
 
 class ResendOTPView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = AUTH_THROTTLES
     
     def post(self, request):
         serializer = ResendOTPSerializer(data=request.data)
@@ -84,10 +89,13 @@ class ResendOTPView(APIView):
             except User.DoesNotExist:
                 return Response({"detail": "User not found"}, status=status.HTTP_404_NOT_FOUND)
             
-            otp = create_and_send_otp(user, purpose='signup')
+            try:
+                otp = create_and_send_otp(user, purpose='signup')
+            except OTPRateLimited:
+                return rate_limited_response()
             return Response({
                 "detail": "OTP resent.", 
-                "otp_debug": otp.otp
+                "otp_debug": otp
             })
         else:
             return Response({
@@ -97,6 +105,8 @@ class ResendOTPView(APIView):
 
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    # Runs before any lookup or password hashing
+    throttle_classes = AUTH_THROTTLES
     
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -131,6 +141,7 @@ class LoginView(APIView):
 
 class ForgotPasswordView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = AUTH_THROTTLES
     
     def post(self, request):
         serializer = ForgotPasswordSerializer(data=request.data)
@@ -141,10 +152,13 @@ class ForgotPasswordView(APIView):
             except User.DoesNotExist:
                 return Response({"detail": "User not found"}, status=status.HTTP_404_NOT_FOUND)
             
-            otp = create_and_send_otp(user, purpose='forgot')
+            try:
+                otp = create_and_send_otp(user, purpose='forgot')
+            except OTPRateLimited:
+                return rate_limited_response()
             return Response({
                 "detail": "OTP sent for password reset.", 
-                "otp_debug": otp.otp
+                "otp_debug": otp
             })
         else:
             return Response({
@@ -167,14 +181,13 @@ class ResetPasswordView(APIView):
             except User.DoesNotExist:
                 return Response({"detail": "User not found"}, status=status.HTTP_404_NOT_FOUND)
             
-            now = timezone.now()
-            otp_qs = OTP.objects.filter(user=user, otp=otp_code, purpose='forgot', is_used=False, expires_at__gte=now)
-            if not otp_qs.exists():
+            try:
+                verified = get_otp_store().verify(user, 'forgot', otp_code)
+            except OTPRateLimited:
+                return rate_limited_response()
+            if not verified:
                 return Response({"detail": "Invalid or expired OTP"}, status=status.HTTP_400_BAD_REQUEST)
             
-            otp = otp_qs.latest('created_at')
-            otp.is_used = True
-            otp.save()
             user.set_password(new_password)
             user.save()
             
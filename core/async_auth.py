@@ -0,0 +1,56 @@
+# core/async_auth.py
+from functools import wraps
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .authentication import acache_user, aget_cached_user, token_version
+
+
+async def aauthenticate(request):
+    """
+    Resolve the bearer token on a plain Django request without blocking
+    the event loop: the token is checked in memory and the user comes from
+    the auth user cache or, on a miss, the async ORM. Returns None when
+    there is no valid token.
+    """
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    if header is None:
+        return None
+    raw_token = auth.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = auth.get_validated_token(raw_token)
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None
+    user = await aget_cached_user(token)
+    if user is not None:
+        return user
+    User = get_user_model()
+    try:
+        user = await User.objects.aget(**{api_settings.USER_ID_FIELD: user_id}, is_active=True)
+    except User.DoesNotExist:
+        return None
+    if api_settings.CHECK_REVOKE_TOKEN and token_version(token) != get_md5_hash_password(user.password):
+        return None
+    await acache_user(token, user)
+    return user
+
+
+def jwt_required(view):
+    """Async counterpart of IsAuthenticated + JWTAuthentication for plain async views."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aauthenticate(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided or are invalid."}, status=401
+            )
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,80 @@
+# core/authentication.py
+"""
+JWT authentication without a user SELECT on every request. Resolved users
+are cached for AUTH_USER_CACHE_TIMEOUT seconds under their id, tagged with
+the token version (simplejwt's REVOKE_TOKEN_CLAIM, present when
+SIMPLE_JWT['CHECK_REVOKE_TOKEN'] is on), and dropped whenever the User row
+is saved or deleted (accounts/signals.py).
+"""
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def token_version(validated_token):
+    return validated_token.get(api_settings.REVOKE_TOKEN_CLAIM, '')
+
+
+def invalidate_user(user_id):
+    _cache().delete(user_cache_key(user_id))
+
+
+def _unpack(entry, validated_token):
+    if entry is not None and entry[0] == token_version(validated_token):
+        return entry[1]
+    return None
+
+
+def get_cached_user(validated_token):
+    return _unpack(_cache().get(user_cache_key(validated_token[api_settings.USER_ID_CLAIM])), validated_token)
+
+
+async def aget_cached_user(validated_token):
+    return _unpack(await _cache().aget(user_cache_key(validated_token[api_settings.USER_ID_CLAIM])), validated_token)
+
+
+def cache_user(validated_token, user):
+    if settings.AUTH_USER_CACHE_TIMEOUT:
+        _cache().set(user_cache_key(user.pk), (token_version(validated_token), user), settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+async def acache_user(validated_token, user):
+    if settings.AUTH_USER_CACHE_TIMEOUT:
+        await _cache().aset(
+            user_cache_key(user.pk), (token_version(validated_token), user), settings.AUTH_USER_CACHE_TIMEOUT
+        )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Drop-in replacement for JWTAuthentication. Views can list actions in
+    `claims_only_actions` to get a TokenUser built from the token alone
+    (no cache, no database); such actions may only use `request.user.id`.
+    """
+
+    def authenticate(self, request):
+        view = (request.parser_context or {}).get('view')
+        self.claims_only = getattr(view, 'action', None) in getattr(view, 'claims_only_actions', ())
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if self.claims_only:
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+        user = get_cached_user(validated_token)
+        if user is None:
+            # Full checks (exists, active, revoked) on a miss only
+            user = super().get_user(validated_token)
+            cache_user(validated_token, user)
+        return user
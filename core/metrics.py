@@ -0,0 +1,125 @@
+# core/metrics.py
+"""
+In-process request metrics, filled by core.middleware.RequestMetricsMiddleware
+and rendered in the Prometheus text format by core.views.metrics. Numbers
+are per worker process; scrape each worker to get the full picture.
+
+Apps add their own numbers through METRICS_COLLECTORS: dotted paths to
+functions returning a list of families built with `counter`, `gauge` or
+`Histogram.family`.
+"""
+import bisect
+import threading
+from collections import namedtuple
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# (name, kind, help, [(sample_name, labels, value), ...])
+Family = namedtuple('Family', 'name kind help samples')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def counter(name, help, values):
+    """`values` is a list of (labels, value) pairs."""
+    return Family(name, 'counter', help, [(name, labels, value) for labels, value in values])
+
+
+def gauge(name, help, values):
+    return Family(name, 'gauge', help, [(name, labels, value) for labels, value in values])
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket', dict(labels, le=f'{bound:g}'), cumulative
+        cumulative += self.counts[-1]
+        yield f'{name}_bucket', dict(labels, le='+Inf'), cumulative
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, cumulative
+
+
+class RequestMetrics:
+    """Per (view, method) aggregates; one lock, updated once per request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+
+    def observe(self, view, method, status, seconds, queries, db_seconds, over_budget):
+        with self._lock:
+            route = self._routes.get((view, method))
+            if route is None:
+                route = self._routes[(view, method)] = {
+                    'statuses': {}, 'latency': Histogram(LATENCY_BUCKETS), 'queries': Histogram(QUERY_BUCKETS),
+                    'db_seconds': 0.0, 'over_budget': 0,
+                }
+            status_class = f'{status // 100}xx'
+            route['statuses'][status_class] = route['statuses'].get(status_class, 0) + 1
+            route['latency'].observe(seconds)
+            route['queries'].observe(queries)
+            route['db_seconds'] += db_seconds
+            route['over_budget'] += int(over_budget)
+
+    def collect(self):
+        with self._lock:
+            routes = sorted(self._routes.items())
+            requests, latency, queries, db_time, over_budget = [], [], [], [], []
+            for (view, method), route in routes:
+                labels = {'view': view, 'method': method}
+                requests.extend((dict(labels, status=s), n) for s, n in sorted(route['statuses'].items()))
+                latency.extend(route['latency'].samples('http_request_duration_seconds', labels))
+                queries.extend(route['queries'].samples('http_request_db_queries', labels))
+                db_time.append((labels, route['db_seconds']))
+                over_budget.append((labels, route['over_budget']))
+        return [
+            counter('http_requests_total', 'Requests by view, method and status class.', requests),
+            Family('http_request_duration_seconds', 'histogram', 'Request latency.', latency),
+            Family('http_request_db_queries', 'histogram', 'SQL queries per request.', queries),
+            counter('http_request_db_seconds_total', 'Time spent in SQL.', db_time),
+            counter(
+                'http_requests_over_query_budget_total',
+                'Requests that ran more than METRICS_QUERY_BUDGET queries.', over_budget,
+            ),
+        ]
+
+
+request_metrics = RequestMetrics()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    families = request_metrics.collect()
+    for path in settings.METRICS_COLLECTORS:
+        families.extend(import_string(path)())
+    lines = []
+    for family in families:
+        lines.append(f'# HELP {family.name} {family.help}')
+        lines.append(f'# TYPE {family.name} {family.kind}')
+        for name, labels, value in family.samples:
+            label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f'{name}{{{label_text}}} {_format(value)}' if label_text else f'{name} {_format(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,94 @@
+# core/middleware.py
+import logging
+import time
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from .metrics import request_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryTimer:
+    """`connection.execute_wrapper` that counts queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, SQL query count and SQL time per resolved view into
+    core.metrics, and logs requests that run more than METRICS_QUERY_BUDGET
+    queries. Under ASGI it runs as async middleware and installs its query
+    timer on the request's thread-sensitive worker thread, where sync views
+    and the async ORM run their queries.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Run natively under ASGI so async views are not pushed onto a thread
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        await sync_to_async(self.install_timer, thread_sensitive=True)(timer)
+        try:
+            started = time.perf_counter()
+            response = await self.get_response(request)
+            elapsed = time.perf_counter() - started
+        finally:
+            await sync_to_async(self.remove_timer, thread_sensitive=True)(timer)
+        self.record(request, response, elapsed, timer)
+        return response
+
+    @staticmethod
+    def install_timer(timer):
+        for connection in connections.all():
+            connection.execute_wrappers.append(timer)
+
+    @staticmethod
+    def remove_timer(timer):
+        for connection in connections.all():
+            if timer in connection.execute_wrappers:
+                connection.execute_wrappers.remove(timer)
+
+    def record(self, request, response, elapsed, timer):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.route) if match else 'unmatched'
+        budget = settings.METRICS_QUERY_BUDGET
+        over_budget = bool(budget) and timer.count > budget
+        if over_budget:
+            logger.warning(
+                "%s %s (%s) ran %d queries, budget is %d", request.method, request.path, view, timer.count, budget
+            )
+        request_metrics.observe(
+            view, request.method, response.status_code, elapsed, timer.count, timer.seconds, over_budget
+        )
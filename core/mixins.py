@@ -0,0 +1,34 @@
+# core/mixins.py
+import hashlib
+from django.utils.cache import get_conditional_response, quote_etag
+
+
+class ConditionalListMixin:
+    """
+    ETag support for list endpoints.
+    Views implement `get_list_version(queryset)`, returning a token that
+    changes whenever any row of the list is created, changed or deleted
+    (a maintained version counter, or indexed aggregates such as
+    Max('updated_at') and Count('id')); unchanged lists are answered with
+    304 before anything is serialized. No Last-Modified is sent: a
+    timestamp cannot express deletions or edits within the same second,
+    so If-Modified-Since alone would get stale 304s.
+    """
+
+    def get_list_version(self, queryset):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        token = self.get_list_version(self.filter_queryset(self.get_queryset()))
+        # The path carries the cursor and filters, and the user id keeps
+        # per-user lists apart
+        raw = f"{token}|{request.user.pk}|{request.get_full_path()}"
+        etag = quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
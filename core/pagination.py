@@ -0,0 +1,40 @@
+# core/pagination.py
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination used by every list endpoint.
+    Views pick their own ordering through a `cursor_ordering` attribute;
+    the leading field must be indexed and (nearly) unique, with `id` as the
+    tie-breaker, so pages are fetched by key instead of OFFSET.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        self.ordering = getattr(view, 'cursor_ordering', self.ordering)
+        return super().get_ordering(request, queryset, view)
+
+
+async def akeyset_page(request, queryset, serializer_class):
+    """
+    Keyset page for the async views, newest first by primary key.
+    `?before=<id>` continues after the last item of the previous page.
+    Raises ValueError on malformed parameters.
+    """
+    size = int(request.GET.get('page_size', KeysetPagination.page_size))
+    size = max(1, min(size, KeysetPagination.max_page_size))
+    before = request.GET.get('before')
+    if before:
+        queryset = queryset.filter(pk__lt=int(before))
+
+    rows = [obj async for obj in queryset.order_by('-pk')[:size + 1].aiterator(chunk_size=size + 1)]
+    next_url = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_url = replace_query_param(request.build_absolute_uri(), 'before', rows[-1].pk)
+    return {'next': next_url, 'results': serializer_class(rows, many=True).data}
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,6 +62,18 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'core.urls'
 
+# Request metrics (see core/metrics.py), served at /api/debug/metrics/.
+# Requests running more than METRICS_QUERY_BUDGET queries are logged and
+# counted; 0 disables the check. Set METRICS_TOKEN to serve the endpoint
+# outside DEBUG (scrapers send it as a Bearer token).
+METRICS_QUERY_BUDGET = int(os.getenv('METRICS_QUERY_BUDGET', '25'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_COLLECTORS = [
+    'products.cache.collect_metrics',
+    'orders.gateway.collect_metrics',
+    'accounts.throttling.collect_metrics',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -110,6 +123,37 @@ DATABASES = {
     }
 }
 
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    # A file-backed test database lets concurrent-checkout tests use real
+    # SQLite locking; the shared in-memory database fails instead of waiting.
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Serialized category/product payloads (see products/cache.py)
+CATALOG_CACHE_ALIAS = os.getenv('CATALOG_CACHE_ALIAS', 'default')
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '300'))
+CATALOG_CACHE_VERSION = 1
+
+# Per-user cart totals; 0 disables caching (see products/cart.py)
+CART_SUMMARY_CACHE_TIMEOUT = int(os.getenv('CART_SUMMARY_CACHE_TIMEOUT', '60'))
+
+
+# Users resolved from JWTs (see core/authentication.py); 0 disables caching.
+# Keep the timeout short: with a per-process cache, other workers only see a
+# deactivation once their copy expires.
+AUTH_USER_CACHE_ALIAS = os.getenv('AUTH_USER_CACHE_ALIAS', 'default')
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '60'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -155,11 +199,17 @@ AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    )
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # Reverse proxies in front of the app. Client IPs (throttling) come from
+    # the X-Forwarded-For entry this many hops back, or REMOTE_ADDR when 0;
+    # the header is client-controlled, so never trust more hops than exist.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
 
 SIMPLE_JWT = {
@@ -170,4 +220,51 @@ SIMPLE_JWT = {
 
 # Razorpay keys
 RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID', '')
-RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET', '')
\ No newline at end of file
+RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET', '')
+# Signs webhook bodies; the webhook endpoint rejects everything while unset
+RAZORPAY_WEBHOOK_SECRET = os.getenv('RAZORPAY_WEBHOOK_SECRET', '')
+
+# Razorpay client behaviour (see orders/gateway.py). RAZORPAY_BASE_URL is
+# empty for the real API; point it at `python -m orders.stub_gateway` locally.
+RAZORPAY_BASE_URL = os.getenv('RAZORPAY_BASE_URL', '')
+RAZORPAY_CONNECT_TIMEOUT = float(os.getenv('RAZORPAY_CONNECT_TIMEOUT', '3.05'))
+RAZORPAY_READ_TIMEOUT = float(os.getenv('RAZORPAY_READ_TIMEOUT', '10'))
+RAZORPAY_MAX_RETRIES = int(os.getenv('RAZORPAY_MAX_RETRIES', '2'))
+RAZORPAY_RETRY_BACKOFF = float(os.getenv('RAZORPAY_RETRY_BACKOFF', '0.2'))
+RAZORPAY_POOL_SIZE = int(os.getenv('RAZORPAY_POOL_SIZE', '20'))
+RAZORPAY_BREAKER_THRESHOLD = int(os.getenv('RAZORPAY_BREAKER_THRESHOLD', '5'))
+RAZORPAY_BREAKER_RESET_SECONDS = float(os.getenv('RAZORPAY_BREAKER_RESET_SECONDS', '30'))
+
+# Unpaid orders hold their stock for this long before
+# `release_expired_reservations` cancels them
+STOCK_RESERVATION_MINUTES = int(os.getenv('STOCK_RESERVATION_MINUTES', '15'))
+
+# Idempotency-Key replay window for order/payment writes (orders/idempotency.py).
+# Duplicates wait up to IDEMPOTENCY_WAIT_SECONDS for the in-flight request
+# (each holds a worker meanwhile, so keep it short) and then get 409; a
+# claim older than IDEMPOTENCY_LOCK_SECONDS with no response is abandoned.
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_KEY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '5'))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '60'))
+
+# Sliding-window limits ("<count>/<sec|min|hour|day>", empty to disable) on
+# login and OTP endpoints, per client IP and per submitted username/email;
+# each endpoint has its own budget (see accounts/throttling.py)
+AUTH_THROTTLE_IP_RATE = os.getenv('AUTH_THROTTLE_IP_RATE', '30/min')
+AUTH_THROTTLE_USERNAME_RATE = os.getenv('AUTH_THROTTLE_USERNAME_RATE', '10/min')
+AUTH_THROTTLE_CACHE_ALIAS = os.getenv('AUTH_THROTTLE_CACHE_ALIAS', 'default')
+
+# OTP delivery (see accounts/delivery.py); the worker is `deliver_otps`
+OTP_SENDER = os.getenv('OTP_SENDER', 'accounts.senders.ConsoleOTPSender')
+OTP_DELIVERY_MAX_ATTEMPTS = int(os.getenv('OTP_DELIVERY_MAX_ATTEMPTS', '5'))
+OTP_DELIVERY_BACKOFF_SECONDS = int(os.getenv('OTP_DELIVERY_BACKOFF_SECONDS', '5'))
+OTP_DELIVERY_LEASE_SECONDS = int(os.getenv('OTP_DELIVERY_LEASE_SECONDS', '60'))
+
+# OTP storage (see accounts/otp_store.py). CacheOTPStore keeps codes out of
+# the database but needs a cache shared by all workers; the default local
+# memory cache is per process, so the database store is the default.
+OTP_STORE = os.getenv('OTP_STORE', 'accounts.otp_store.DatabaseOTPStore')
+OTP_CACHE_ALIAS = os.getenv('OTP_CACHE_ALIAS', 'default')
+OTP_ISSUE_LIMIT = int(os.getenv('OTP_ISSUE_LIMIT', '5'))
+OTP_VERIFY_LIMIT = int(os.getenv('OTP_VERIFY_LIMIT', '10'))
+OTP_RATE_WINDOW_SECONDS = int(os.getenv('OTP_RATE_WINDOW_SECONDS', '900'))
@@ -0,0 +1,80 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.handlers.base import BaseHandler
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .metrics import request_metrics
+from .middleware import RequestMetricsMiddleware
+
+User = get_user_model()
+
+
+@override_settings(METRICS_TOKEN='scrape-me')
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        request_metrics.reset()
+        self.user = User.objects.create_user(username='metered', email='metered@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+
+    def scrape(self, token='scrape-me'):
+        return self.client.get('/api/debug/metrics/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_records_latency_and_queries_per_view(self):
+        self.client.get('/api/orders/orders/')
+        self.client.get('/api/orders/orders/')
+        self.client.get('/api/nowhere/')
+        text = self.scrape().content.decode()
+        self.assertIn('http_requests_total{view="orders-list",method="GET",status="2xx"} 2', text)
+        self.assertIn('http_requests_total{view="unmatched",method="GET",status="4xx"} 1', text)
+        self.assertIn('http_request_duration_seconds_count{view="orders-list",method="GET"} 2', text)
+        self.assertIn('http_request_duration_seconds_bucket{view="orders-list",method="GET",le="+Inf"} 2', text)
+        self.assertIn('http_request_db_queries_sum{view="orders-list",method="GET"}', text)
+        # App collectors are included
+        self.assertIn('catalog_cache_hits_total ', text)
+        self.assertIn('payment_gateway_circuit_state 0', text)
+        self.assertIn('# TYPE auth_throttle_rejections_total counter', text)
+
+    @override_settings(METRICS_QUERY_BUDGET=1)
+    def test_flags_requests_over_query_budget(self):
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            self.client.get('/api/orders/orders/')
+        self.assertIn('orders-list', logs.output[0])
+        self.assertIn(
+            'http_requests_over_query_budget_total{view="orders-list",method="GET"} 1', self.scrape().content.decode()
+        )
+
+    def test_endpoint_requires_token(self):
+        self.assertEqual(self.scrape('wrong').status_code, 403)
+        response = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self.scrape().status_code, 404)
+
+    def test_runs_natively_under_asgi(self):
+        handler = BaseHandler()
+        handler.load_middleware(is_async=True)
+        # A sync-only middleware would be wrapped in sync_to_async here
+        self.assertIsInstance(handler._middleware_chain.__wrapped__, RequestMetricsMiddleware)
+
+    async def test_records_async_views(self):
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.user)))()
+        response = await self.async_client.get(
+            '/api/products/async/categories/', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        text = await sync_to_async(lambda: self.scrape().content.decode())()
+        self.assertIn('http_request_duration_seconds_count{view="async-category-list",method="GET"} 1', text)
+
+    async def test_counts_queries_of_sync_views_under_asgi(self):
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.user)))()
+        response = await self.async_client.get('/api/orders/orders/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        families = {family.name: family for family in request_metrics.collect()}
+        (count,) = [
+            value for name, labels, value in families['http_request_db_queries'].samples
+            if name == 'http_request_db_queries_sum' and labels['view'] == 'orders-list'
+        ]
+        self.assertGreater(count, 0)
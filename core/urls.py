@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
+from .views import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -23,4 +24,5 @@ urlpatterns = [
     path('api/products/', include('products.urls')),
     path('api/orders/', include('orders.urls')),
    # path('api/debug/routes/', list_all_routes, name='debug-routes'), 
+    path('api/debug/metrics/', metrics, name='metrics'),
 ]
@@ -0,0 +1,22 @@
+# core/views.py
+import hmac
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from .metrics import render
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus scrape target. Requires `Authorization: Bearer <METRICS_TOKEN>`
+    when METRICS_TOKEN is set; without a token it is only served in DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,17 @@
+# orders/async_views.py
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from core.async_auth import jwt_required
+from core.pagination import akeyset_page
+from .models import Order
+from .serializers import OrderSerializer
+
+@require_GET
+@jwt_required
+async def order_history(request):
+    """Async order history under /api/orders/async/orders/"""
+    try:
+        page = await akeyset_page(request, Order.objects.filter(user=request.user).for_history(), OrderSerializer)
+    except ValueError:
+        return JsonResponse({"detail": "Invalid page parameters."}, status=400)
+    return JsonResponse(page)
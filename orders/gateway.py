@@ -0,0 +1,245 @@
+# orders/gateway.py
+"""
+Payment gateway service. All Razorpay calls go through `get_gateway()`,
+which shares one pooled HTTP session per process and wraps every call in
+strict timeouts, jittered retries, a circuit breaker and latency stats.
+"""
+import hashlib
+import hmac
+import random
+import string
+import threading
+import time
+
+import razorpay
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
+from core.metrics import counter, gauge
+
+
+class GatewayError(Exception):
+    pass
+
+class GatewayUnavailable(GatewayError):
+    """The gateway is failing or the circuit is open; safe to retry later."""
+
+class GatewayRejected(GatewayError):
+    """The gateway refused the request (4xx); retrying will not help."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single trial call through
+    (half-open) to decide whether to close again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        with self._lock:
+            state = self._state()
+            if state == 'open' or (state == 'half-open' and self._trial_in_flight):
+                raise GatewayUnavailable("Payment gateway circuit is open.")
+            if state == 'half-open':
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class CallStats:
+    """Per-operation call counts and latency, kept in process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ops = {}
+
+    def record(self, operation, elapsed_ms, ok):
+        with self._lock:
+            op = self._ops.setdefault(operation, {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            op['calls'] += 1
+            op['errors'] += 0 if ok else 1
+            op['total_ms'] += elapsed_ms
+            op['max_ms'] = max(op['max_ms'], elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: dict(op, avg_ms=op['total_ms'] / op['calls'] if op['calls'] else 0.0)
+                for name, op in self._ops.items()
+            }
+
+
+class RazorpayGateway:
+    def __init__(self, key_id, key_secret, base_url='', connect_timeout=3.05, read_timeout=10.0,
+                 max_retries=2, backoff=0.2, backoff_cap=2.0, pool_size=20, breaker=None):
+        session = requests.Session()
+        # Retries are handled here, not by urllib3, so they count towards the breaker
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        options = {'base_url': base_url} if base_url else {}
+        self.client = razorpay.Client(session=session, auth=(key_id, key_secret), **options)
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = CallStats()
+
+    def create_order(self, amount_paisa, currency='INR', receipt=None):
+        data = {'amount': amount_paisa, 'currency': currency, 'payment_capture': 1}
+        if receipt:
+            data['receipt'] = receipt
+        return self._call(
+            'order.create', lambda: self.client.order.create(data=data, timeout=self.timeout), idempotent=False
+        )
+
+    def fetch_order_payments(self, razorpay_order_id):
+        response = self._call(
+            'order.payments', lambda: self.client.order.payments(razorpay_order_id, timeout=self.timeout)
+        )
+        return response.get('items', [])
+
+    def verify_payment_signature(self, payload):
+        # Local HMAC check, no network round trip
+        self.client.utility.verify_payment_signature(payload)
+
+    def _call(self, operation, fn, idempotent=True):
+        self.breaker.before_call()
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                result = fn()
+            except razorpay.errors.BadRequestError as exc:
+                # The gateway answered, so it is healthy
+                self.stats.record(operation, (time.perf_counter() - started) * 1000, ok=False)
+                self.breaker.record_success()
+                raise GatewayRejected(str(exc)) from exc
+            except (requests.RequestException, razorpay.errors.ServerError, razorpay.errors.GatewayError) as exc:
+                self.stats.record(operation, (time.perf_counter() - started) * 1000, ok=False)
+                self.breaker.record_failure()
+                # A read timeout on a create may have been processed; do not repeat it
+                retryable = idempotent or not isinstance(exc, requests.ReadTimeout)
+                if not retryable or attempt == self.max_retries or self.breaker.state == 'open':
+                    raise GatewayUnavailable(f"Payment gateway call {operation} failed: {exc}") from exc
+                time.sleep(random.uniform(0, min(self.backoff_cap, self.backoff * 2 ** attempt)))
+                continue
+            except Exception:
+                # Unexpected (a malformed response, a client bug): count it so a
+                # half-open trial never stays in flight and wedges the breaker
+                self.stats.record(operation, (time.perf_counter() - started) * 1000, ok=False)
+                self.breaker.record_failure()
+                raise
+            self.stats.record(operation, (time.perf_counter() - started) * 1000, ok=True)
+            self.breaker.record_success()
+            return result
+
+
+class OfflineGateway:
+    """Used when no Razorpay keys are configured (local development)."""
+
+    def __init__(self):
+        self.stats = CallStats()
+        self.breaker = CircuitBreaker()
+
+    def create_order(self, amount_paisa, currency='INR', receipt=None):
+        return {
+            "id": "order_test_" + ''.join(random.choices(string.ascii_letters + string.digits, k=10)),
+            "amount": amount_paisa,
+            "currency": currency,
+        }
+
+    def fetch_order_payments(self, razorpay_order_id):
+        return []
+
+    def verify_payment_signature(self, payload):
+        # Without keys nothing can be verified for real: refuse outside DEBUG,
+        # and in DEBUG still check the HMAC, against the (empty) dev secret
+        if not settings.DEBUG:
+            raise GatewayUnavailable("Razorpay keys are not configured.")
+        message = f"{payload.get('razorpay_order_id')}|{payload.get('razorpay_payment_id')}"
+        expected = hmac.new(settings.RAZORPAY_KEY_SECRET.encode(), message.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, str(payload.get('razorpay_signature') or '')):
+            raise razorpay.errors.SignatureVerificationError("Razorpay Signature Verification Failed")
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway():
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = build_gateway()
+    return _gateway
+
+def build_gateway():
+    if not (settings.RAZORPAY_KEY_ID and settings.RAZORPAY_KEY_SECRET):
+        return OfflineGateway()
+    return RazorpayGateway(
+        settings.RAZORPAY_KEY_ID,
+        settings.RAZORPAY_KEY_SECRET,
+        base_url=settings.RAZORPAY_BASE_URL,
+        connect_timeout=settings.RAZORPAY_CONNECT_TIMEOUT,
+        read_timeout=settings.RAZORPAY_READ_TIMEOUT,
+        max_retries=settings.RAZORPAY_MAX_RETRIES,
+        backoff=settings.RAZORPAY_RETRY_BACKOFF,
+        pool_size=settings.RAZORPAY_POOL_SIZE,
+        breaker=CircuitBreaker(settings.RAZORPAY_BREAKER_THRESHOLD, settings.RAZORPAY_BREAKER_RESET_SECONDS),
+    )
+
+@receiver(setting_changed)
+def reset_gateway(setting=None, **kwargs):
+    global _gateway
+    if setting is None or setting.startswith('RAZORPAY_'):
+        _gateway = None
+
+BREAKER_STATES = {'closed': 0, 'half-open': 1, 'open': 2}
+
+def collect_metrics():
+    gateway = get_gateway()
+    ops = sorted(gateway.stats.snapshot().items())
+    return [
+        counter('payment_gateway_calls_total', 'Gateway calls, including retries.',
+                [({'operation': name}, op['calls']) for name, op in ops]),
+        counter('payment_gateway_errors_total', 'Failed gateway calls.',
+                [({'operation': name}, op['errors']) for name, op in ops]),
+        counter('payment_gateway_seconds_total', 'Time spent waiting on the gateway.',
+                [({'operation': name}, op['total_ms'] / 1000) for name, op in ops]),
+        gauge('payment_gateway_circuit_state', 'Circuit breaker state: 0 closed, 1 half-open, 2 open.',
+              [({}, BREAKER_STATES[gateway.breaker.state])]),
+    ]
@@ -0,0 +1,118 @@
+# orders/idempotency.py
+"""
+Idempotency-Key support for write endpoints. The first request with a
+key claims it by inserting a row (unique on user + key); its response is
+stored and replayed to later requests with the same key until the row
+expires. Duplicates that arrive while the first is still running wait
+for it (polling the row, at most IDEMPOTENCY_WAIT_SECONDS) and replay its
+response; only if it is still running after that do they get 409.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+
+def fingerprint(request):
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{payload}".encode()).hexdigest()
+
+def claim(user, key, request_fingerprint):
+    """Return (record, True) if this request owns the key, else (existing record or None, False)."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+    # Expired keys, and claims whose owner died mid-request, can be taken over
+    IdempotencyKey.objects.filter(user=user, key=key).filter(
+        Q(expires_at__lt=now) | Q(status_code__isnull=True, created_at__lt=stale)
+    ).delete()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                user=user, key=key, fingerprint=request_fingerprint,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+            ), True
+    except IntegrityError:
+        return IdempotencyKey.objects.filter(user=user, key=key).first(), False
+
+def wait_for(record):
+    """Poll until the owner stores its response or releases the key, backing off up to 0.2s."""
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.02
+    while time.monotonic() < deadline:
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+        if record is None or record.status_code is not None:
+            return record
+        time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+        delay = min(delay * 2, 0.2)
+    return record
+
+def replay(record):
+    response = Response(record.response_body, status=record.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(view):
+    """
+    Decorate a view method (`self, request, ...`). Requests without the
+    header run as before. Server errors are not stored, so the client can
+    retry them with the same key.
+    """
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'detail': f'{HEADER} is too long.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        request_fingerprint = fingerprint(request)
+        for _ in range(2):
+            record, owner = claim(request.user, key, request_fingerprint)
+            if owner:
+                break
+            if record is None:
+                continue
+            if record.fingerprint != request_fingerprint:
+                return Response(
+                    {'detail': f'{HEADER} was already used for a different request.'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            record = wait_for(record)
+            if record is None:
+                # The first attempt failed and released the key; try to claim it
+                continue
+            if record.status_code is None:
+                break
+            return replay(record)
+        if not owner:
+            response = Response(
+                {'detail': f'A request with this {HEADER} is still in progress.'},
+                status=status.HTTP_409_CONFLICT
+            )
+            response['Retry-After'] = '1'
+            return response
+
+        try:
+            response = view(self, request, *args, **kwargs)
+        except BaseException:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status_code=response.status_code, response_body=response.data
+            )
+        return response
+    return wrapper
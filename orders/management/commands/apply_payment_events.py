@@ -0,0 +1,25 @@
+# orders/management/commands/apply_payment_events.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.payments import apply_payment_events
+
+
+class Command(BaseCommand):
+    help = "Apply queued Razorpay webhook and reconciliation events to orders in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Process what is queued now and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = apply_payment_events(options['batch_size'])
+            if processed:
+                self.stdout.write(f"processed={processed}")
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,71 @@
+# orders/management/commands/bench_order_history.py
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializer
+from products.models import Category, Product, ProductVariant
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark serializing a user's full order history. All rows are rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--items-per-order', type=int, default=3)
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                category = Category.objects.create(name='Bench history', slug='bench-history')
+                products = Product.objects.bulk_create([
+                    Product(category=category, title=f'History product {i}') for i in range(50)
+                ])
+                variants = ProductVariant.objects.bulk_create([
+                    ProductVariant(product=products[i % 50], sku=f'HIST-{i}', color='Black', size=str(i % 5),
+                                   price=Decimal('5.00'), stock=10)
+                    for i in range(200)
+                ])
+                for size in options['sizes']:
+                    self.bench(size, variants, options['items_per_order'], options['runs'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def bench(self, size, variants, items_per_order, runs):
+        user = User.objects.create_user(
+            username=f'history_{size}', email=f'history_{size}@example.com', password='bench-pass'
+        )
+        orders = Order.objects.bulk_create([
+            Order(user=user, total_amount=Decimal('15.00'), status='placed') for _ in range(size)
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=variant.product_id, variant=variant, quantity=1,
+                      unit_price=variant.price, total_price=variant.price)
+            for n, order in enumerate(orders)
+            for variant in variants[n % 50:n % 50 + items_per_order]
+        ], batch_size=1000)
+
+        timings = []
+        for _ in range(runs):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                OrderSerializer(Order.objects.filter(user=user).for_history(), many=True).data
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f"orders={size:<5} items={size * items_per_order:<6} queries={len(ctx.captured_queries):<3} "
+            f"median={timings[len(timings) // 2]:.1f}ms"
+        )
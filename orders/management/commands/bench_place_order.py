@@ -0,0 +1,63 @@
+# orders/management/commands/bench_place_order.py
+import statistics
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from orders.serializers import OrderCreateSerializer
+from products.models import Category, Product, ProductVariant, CartItem
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark OrderCreateSerializer.create for carts of different sizes. All rows are rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 20, 200])
+        parser.add_argument('--runs', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options['runs'] < 2:
+            raise CommandError("--runs must be at least 2 to compute percentiles.")
+        try:
+            with transaction.atomic():
+                for size in options['sizes']:
+                    self.bench(size, options['runs'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def bench(self, size, runs):
+        user = User.objects.create_user(
+            username=f'bench_{size}', email=f'bench_{size}@example.com', password='bench-pass'
+        )
+        category, _ = Category.objects.get_or_create(slug='bench', defaults={'name': 'Bench'})
+        product = Product.objects.create(category=category, title=f'Bench product {size}')
+        variants = ProductVariant.objects.bulk_create([
+            ProductVariant(product=product, sku=f'BENCH-{size}-{i}', price=Decimal('9.99'), stock=1000)
+            for i in range(size)
+        ])
+        CartItem.objects.bulk_create([CartItem(user=user, variant=v, quantity=2) for v in variants])
+
+        request = SimpleNamespace(user=user)
+        timings = []
+        for _ in range(runs):
+            serializer = OrderCreateSerializer(data={}, context={'request': request})
+            serializer.is_valid(raise_exception=True)
+            started = time.perf_counter()
+            serializer.save()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        cuts = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f"cart lines={size:<4} runs={runs:<4} p50={cuts[49]:.2f}ms p99={cuts[98]:.2f}ms"
+        )
@@ -0,0 +1,126 @@
+# orders/management/commands/check_query_plans.py
+import re
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from accounts.models import OTP
+from orders.models import Order
+from products.models import Category, Product, ProductVariant, CartItem, WishlistItem
+
+User = get_user_model()
+
+# Plan lines that read a whole table rather than an index
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r"\bSCAN (?!.*\b(USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY|VIRTUAL TABLE)\b)"),
+    'postgresql': re.compile(r"\bSeq Scan on\b"),
+    'mysql': re.compile(r"\btype\W+ALL\b"),
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def hot_queries(user, product, now):
+    """The queries the API runs on every request, keyed by where they come from."""
+    return {
+        'VerifyOTPView OTP lookup': OTP.objects.filter(
+            user=user, otp='123456', is_used=False, expires_at__gte=now
+        ).order_by('-created_at')[:1],
+        'ResetPasswordView OTP lookup': OTP.objects.filter(
+            user=user, otp='123456', purpose='forgot', is_used=False, expires_at__gte=now
+        ).order_by('-created_at')[:1],
+        'OrderViewSet.list page': Order.objects.filter(user=user).order_by('-created_at', '-id')[:21],
+        'OrderViewSet.list version': Order.objects.filter(user=user).values('user').annotate(
+            last=Max('updated_at'), count=Count('id')
+        ).order_by(),
+        'Order by razorpay_order_id': Order.objects.filter(razorpay_order_id='order_missing'),
+        'Stale pending orders': Order.objects.filter(
+            status='pending', created_at__lt=now - timedelta(minutes=15)
+        ).order_by('created_at', 'id')[:500],
+        'ProductViewSet.list page': Product.objects.order_by('-created_at', '-id')[:21],
+        'Variants of a product': ProductVariant.objects.filter(product=product).order_by('price'),
+        'Variants in a price range': ProductVariant.objects.filter(
+            price__gte=Decimal('10.00'), price__lte=Decimal('12.00')
+        ),
+        'CartViewSet.list page': CartItem.objects.filter(user=user).order_by('-added_at', '-id')[:21],
+        'WishlistViewSet.list page': WishlistItem.objects.filter(user=user).order_by('-added_at', '-id')[:21],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large dataset inside a rolled-back transaction, EXPLAIN each hot query "
+        "and fail if any of them scans a whole table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help="Approximate number of orders/variants/OTPs to seed.")
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"No scan detection for database vendor '{connection.vendor}'.")
+
+        failures = []
+        try:
+            with transaction.atomic():
+                user, product = self.seed(options['rows'])
+                if connection.vendor != 'mysql':
+                    with connection.cursor() as cursor:
+                        cursor.execute("ANALYZE")
+
+                for name, queryset in hot_queries(user, product, timezone.now()).items():
+                    plan = queryset.explain()
+                    scans = [line.strip() for line in plan.splitlines() if pattern.search(line)]
+                    status = 'FULL SCAN' if scans else 'ok'
+                    self.stdout.write(f"[{status}] {name}")
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+                    if scans:
+                        failures.append(name)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Full table scan in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("No full table scans in hot queries."))
+
+    def seed(self, rows):
+        now = timezone.now()
+        users = User.objects.bulk_create([
+            User(username=f'plan_{i}', email=f'plan_{i}@example.com', password='!')
+            for i in range(max(rows // 100, 2))
+        ])
+        category = Category.objects.create(name='Plan check', slug='plan-check')
+        products = Product.objects.bulk_create([
+            Product(category=category, title=f'Plan product {i}') for i in range(max(rows // 10, 2))
+        ])
+        variants = ProductVariant.objects.bulk_create([
+            ProductVariant(product=products[i % len(products)], price=Decimal(i % 500) + Decimal('0.99'), stock=5)
+            for i in range(rows)
+        ], batch_size=1000)
+        Order.objects.bulk_create([
+            Order(user=users[i % len(users)], total_amount=Decimal('10.00'),
+                  status='pending' if i % 20 == 0 else 'placed',
+                  razorpay_order_id=f'order_plan_{i}', created_at=now - timedelta(minutes=i))
+            for i in range(rows)
+        ], batch_size=1000)
+        OTP.objects.bulk_create([
+            OTP(user=users[i % len(users)], otp=f'{100000 + i % 900000}', expires_at=now + timedelta(minutes=10))
+            for i in range(rows)
+        ], batch_size=1000)
+        CartItem.objects.bulk_create([
+            CartItem(user=users[i % len(users)], variant=variants[i]) for i in range(min(rows, len(variants)))
+        ], batch_size=1000)
+        WishlistItem.objects.bulk_create([
+            WishlistItem(user=users[i % len(users)], product=products[i]) for i in range(len(products))
+        ], batch_size=1000)
+        return users[0], products[0]
@@ -0,0 +1,22 @@
+# orders/management/commands/purge_idempotency_keys.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key records, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        expired = IdempotencyKey.objects.filter(expires_at__lt=timezone.now())
+        total = 0
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:options['chunk_size']])
+            if not ids:
+                break
+            total += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(f"Purged {total} idempotency key(s).")
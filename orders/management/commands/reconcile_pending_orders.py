@@ -0,0 +1,30 @@
+# orders/management/commands/reconcile_pending_orders.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.payments import apply_payment_events, reconcile_pending_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Check stale pending orders with the payment gateway in chunks and apply any captured payments. "
+        "Schedule it more often than release_expired_reservations so paid orders are not cancelled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=5, help="Only check orders pending for longer than this.")
+        parser.add_argument('--chunk-size', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent gateway lookups per chunk.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['minutes'])
+        checked, captured = reconcile_pending_orders(cutoff, options['chunk_size'], options['workers'])
+        applied = 0
+        while True:
+            processed = apply_payment_events()
+            if not processed:
+                break
+            applied += processed
+        self.stdout.write(f"Checked {checked} pending order(s); {captured} were paid; applied {applied} event(s).")
@@ -0,0 +1,21 @@
+# orders/management/commands/release_expired_reservations.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.utils import expire_pending_orders
+
+
+class Command(BaseCommand):
+    help = "Cancel unpaid pending orders whose stock reservation has expired and restock their variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=settings.STOCK_RESERVATION_MINUTES)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['minutes'])
+        expired = expire_pending_orders(cutoff, chunk_size=options['chunk_size'])
+        self.stdout.write(f"Released reservations for {expired} order(s).")
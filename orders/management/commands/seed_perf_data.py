@@ -0,0 +1,171 @@
+# orders/management/commands/seed_perf_data.py
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from products.models import Category, Product, ProductVariant, CartItem
+
+User = get_user_model()
+
+COLORS = ['Black', 'White', 'Red', 'Blue', 'Green', 'Grey', 'Navy', 'Beige']
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+WORDS = [
+    'classic', 'cotton', 'linen', 'slim', 'relaxed', 'everyday', 'premium', 'organic', 'vintage', 'sport',
+    'shirt', 'tee', 'jacket', 'hoodie', 'trousers', 'shorts', 'dress', 'sneaker', 'boot', 'bag',
+]
+STATUSES = ['placed'] * 7 + ['pending', 'cancelled', 'failed']
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate deterministic users, catalog, carts and orders for performance work. "
+        "Rows are written in batches; the same --seed always produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--products', type=int, default=5000)
+        parser.add_argument('--variants-per-product', type=int, default=4)
+        parser.add_argument('--cart-items-per-user', type=int, default=3)
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument('--items-per-order', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='perf', help="Username and slug prefix of generated rows.")
+        parser.add_argument('--password', default='perf-pass', help="Password of every generated user.")
+        parser.add_argument('--clear', action='store_true', help="Delete rows from an earlier run with this prefix.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+
+        existing = User.objects.filter(username__startswith=f'{prefix}_user_')
+        if existing.exists():
+            if not options['clear']:
+                raise CommandError(f"Data with prefix '{prefix}' exists; pass --clear to replace it.")
+            existing.delete()
+            Category.objects.filter(slug__startswith=f'{prefix}-').delete()
+
+        user_ids = self.seed_users(prefix, options['users'], options['password'])
+        variants = self.seed_catalog(
+            prefix, options['categories'], options['products'], options['variants_per_product']
+        )
+        self.seed_carts(user_ids, variants, options['cart_items_per_user'])
+        self.seed_orders(user_ids, variants, options['orders'], options['items_per_order'])
+
+    def chunks(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def insert(self, model, rows, label):
+        """bulk_create `rows` in batches, one transaction each; returns the new primary keys."""
+        ids, total = [], 0
+        for batch in self.chunks(rows):
+            with transaction.atomic():
+                created = model.objects.bulk_create(batch)
+            ids.extend(obj.pk for obj in created)
+            total += len(batch)
+        self.stdout.write(f"{label}: {total}")
+        return ids
+
+    def seed_users(self, prefix, count, password):
+        # Hash once; PBKDF2 per user would dominate the run
+        hashed = make_password(password)
+        return self.insert(User, (
+            User(username=f'{prefix}_user_{i}', email=f'{prefix}_user_{i}@example.com', password=hashed,
+                 is_active=True, is_verified=True)
+            for i in range(count)
+        ), 'users')
+
+    def seed_catalog(self, prefix, categories, products, variants_per_product):
+        category_ids = self.insert(Category, (
+            Category(name=f'{prefix.title()} category {i}', slug=f'{prefix}-category-{i}') for i in range(categories)
+        ), 'categories')
+        rng = self.rng
+        product_ids = self.insert(Product, (
+            Product(
+                category_id=category_ids[i % len(category_ids)],
+                title=' '.join(rng.sample(WORDS, 3)).title(),
+                description=' '.join(rng.choices(WORDS, k=12)),
+            )
+            for i in range(products)
+        ), 'products')
+        lookup = {}
+
+        def variants():
+            for product_id in product_ids:
+                base = Decimal(rng.randrange(199, 19999)) / 100
+                for v in range(variants_per_product):
+                    price = base + v
+                    yield ProductVariant(
+                        product_id=product_id, sku=f'{prefix.upper()}-{product_id}-{v}',
+                        color=rng.choice(COLORS), size=SIZES[v % len(SIZES)], price=price,
+                        stock=rng.randrange(1000, 5000),
+                    )
+
+        self.insert(ProductVariant, variants(), 'variants')
+        # What order lines need to snapshot, by variant id
+        rows = ProductVariant.objects.filter(product__category_id__in=category_ids).values_list(
+            'id', 'product_id', 'price', 'product__title', 'sku', 'color', 'size'
+        )
+        for vid, *row in rows.iterator(chunk_size=self.batch_size):
+            lookup[vid] = row
+        return lookup
+
+    def seed_carts(self, user_ids, variants, per_user):
+        variant_ids = list(variants)
+        per_user = min(per_user, len(variant_ids))
+        self.insert(CartItem, (
+            CartItem(user_id=user_id, variant_id=variant_id, quantity=self.rng.randint(1, 3))
+            for user_id in user_ids
+            for variant_id in self.rng.sample(variant_ids, per_user)
+        ), 'cart items')
+
+    def seed_orders(self, user_ids, variants, count, items_per_order):
+        rng = self.rng
+        variant_ids = list(variants)
+        now = timezone.now()
+        total_orders = total_items = 0
+        # Orders and their items are written batch by batch so memory stays flat
+        for start in range(0, count, self.batch_size):
+            orders, lines = [], []
+            for _ in range(min(self.batch_size, count - start)):
+                picked = [
+                    (vid, rng.randint(1, 3)) for vid in rng.sample(variant_ids, min(items_per_order, len(variant_ids)))
+                ]
+                total = sum(variants[vid][1] * qty for vid, qty in picked)
+                orders.append(Order(
+                    user_id=rng.choice(user_ids), total_amount=total, status=rng.choice(STATUSES),
+                    razorpay_order_id=f'order_perf{rng.getrandbits(48):012x}',
+                    created_at=now - timedelta(seconds=rng.randrange(365 * 24 * 3600)),
+                ))
+                lines.append(picked)
+            with transaction.atomic():
+                Order.objects.bulk_create(orders)
+                items = []
+                for order, picked in zip(orders, lines):
+                    for vid, qty in picked:
+                        product_id, price, title, sku, color, size = variants[vid]
+                        items.append(OrderItem(
+                            order=order, product_id=product_id, variant_id=vid, title=title, sku=sku,
+                            color=color, size=size, quantity=qty, unit_price=price, total_price=price * qty,
+                        ))
+                OrderItem.objects.bulk_create(items, batch_size=self.batch_size)
+            total_orders += len(orders)
+            total_items += len(items)
+        self.stdout.write(f"orders: {total_orders} ({total_items} items)")
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_snapshots(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    batch = []
+    items = OrderItem.objects.select_related('product', 'variant').order_by('pk')
+    for item in items.iterator(chunk_size=2000):
+        item.title = item.product.title if item.product else ''
+        if item.variant:
+            item.sku, item.color, item.size = item.variant.sku, item.variant.color, item.variant.size
+        batch.append(item)
+        if len(batch) == 2000:
+            OrderItem.objects.bulk_update(batch, ['title', 'sku', 'color', 'size'])
+            batch = []
+    if batch:
+        OrderItem.objects.bulk_update(batch, ['title', 'sku', 'color', 'size'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_hot_query_indexes'),
+        ('products', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='color',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='size',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='sku',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='title',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.product'),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_payment_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'updated_at'], name='order_user_updated_idx'),
+        ),
+    ]
@@ -1,7 +1,14 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
 
+class OrderQuerySet(models.QuerySet):
+    def for_history(self):
+        # Items carry their own snapshot, so one extra single-table query
+        # covers every order on the page
+        return self.prefetch_related('items')
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending Payment'),
@@ -16,17 +23,87 @@ class Order(models.Model):
     razorpay_order_id = models.CharField(max_length=255, blank=True, null=True)
     razorpay_payment_id = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Order history, paged by (-created_at, -id)
+            models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_idx'),
+            # Stale pending orders for reservation expiry
+            models.Index(fields=['status', 'created_at', 'id'], name='order_status_created_idx'),
+            models.Index(fields=['razorpay_order_id'], name='order_razorpay_id_idx'),
+            # Order history ETag: Max(updated_at) and Count(id) per user
+            models.Index(fields=['user', 'updated_at'], name='order_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} ({self.user}) - {self.status}"
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
-    product = models.ForeignKey('products.Product', related_name='+', on_delete=models.CASCADE)
+    product = models.ForeignKey('products.Product', related_name='+', on_delete=models.SET_NULL, null=True, blank=True)
     variant = models.ForeignKey('products.ProductVariant', related_name='+', on_delete=models.SET_NULL, null=True, blank=True)
+    # Snapshot of the catalog at purchase time; history never reads the live rows
+    title = models.CharField(max_length=255, blank=True, default='')
+    sku = models.CharField(max_length=100, blank=True, null=True)
+    color = models.CharField(max_length=50, blank=True, null=True)
+    size = models.CharField(max_length=50, blank=True, null=True)
     quantity = models.PositiveIntegerField(default=1)
     unit_price = models.DecimalField(max_digits=12, decimal_places=2)  
     total_price = models.DecimalField(max_digits=12, decimal_places=2)
 
     def __str__(self):
-        return f"{self.order} - {self.product} x{self.quantity}"
\ No newline at end of file
+        return f"{self.order} - {self.title} x{self.quantity}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    First response for a client-supplied Idempotency-Key. A row with no
+    status_code is a request still in flight; see orders/idempotency.py.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.key} ({self.status_code or 'in flight'})"
+
+class PaymentEvent(models.Model):
+    """
+    Inbox row for a Razorpay webhook (or a reconciliation finding). The
+    webhook only stores it; `apply_payment_events` applies it to the order.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('applied', 'Applied'),
+        ('ignored', 'Ignored'),
+    ]
+
+    event_id = models.CharField(max_length=100, unique=True)
+    event = models.CharField(max_length=50)
+    razorpay_order_id = models.CharField(max_length=255, blank=True, default='')
+    razorpay_payment_id = models.CharField(max_length=255, blank=True, default='')
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    note = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='payment_event_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.razorpay_order_id} ({self.status})"
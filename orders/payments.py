@@ -0,0 +1,156 @@
+# orders/payments.py
+import hashlib
+import hmac
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from products.cart import invalidate_cart_summary
+from products.models import CartItem
+from .gateway import GatewayError, GatewayRejected, get_gateway
+from .models import Order, PaymentEvent
+
+logger = logging.getLogger(__name__)
+
+CAPTURED_EVENTS = {'payment.captured', 'order.paid', 'reconcile.captured'}
+
+def verify_webhook_signature(body, signature):
+    secret = settings.RAZORPAY_WEBHOOK_SECRET
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def enqueue_webhook(body, event_id=None):
+    """
+    Store a verified webhook body for the worker. Razorpay redelivers
+    events, so the event id (or a hash of the body) dedupes them.
+    """
+    data = json.loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("Webhook body is not an object")
+    payment = _entity(data, 'payment')
+    order = _entity(data, 'order')
+    PaymentEvent.objects.bulk_create([PaymentEvent(
+        event_id=event_id or hashlib.sha256(body).hexdigest(),
+        event=str(data.get('event') or ''),
+        razorpay_order_id=str(payment.get('order_id') or order.get('id') or ''),
+        razorpay_payment_id=str(payment.get('id') or ''),
+        payload=data,
+    )], ignore_conflicts=True)
+
+def _entity(data, name):
+    """data['payload'][name]['entity'], or {} when any level is missing or not an object."""
+    value = data
+    for key in ('payload', name, 'entity'):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value if isinstance(value, dict) else {}
+
+def apply_payment_events(batch_size=200):
+    """
+    Apply one batch of pending events: one query for the batch, one for
+    the orders it mentions, one bulk_update each for orders and events,
+    and one delete for the paid orders' carts. Returns the number of
+    events processed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            PaymentEvent.objects.select_for_update(skip_locked=True)
+            .filter(status='pending').order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+        orders = {}
+        for order in Order.objects.select_for_update().filter(
+            razorpay_order_id__in={e.razorpay_order_id for e in events if e.razorpay_order_id}
+        ):
+            orders[order.razorpay_order_id] = order
+
+        changed = {}
+        for event in events:
+            event.processed_at = now
+            order = orders.get(event.razorpay_order_id)
+            if event.event not in CAPTURED_EVENTS:
+                event.status, event.note = 'ignored', 'not a capture event'
+            elif order is None:
+                event.status, event.note = 'ignored', 'unknown order'
+            elif order.status not in ('pending', 'placed'):
+                # Paid after the reservation expired; needs a refund or manual review
+                event.status, event.note = 'ignored', f'order is {order.status}'
+                logger.warning("Payment %s captured for %s order %s", event.razorpay_payment_id, order.status, order.id)
+            else:
+                order.status = 'placed'
+                order.razorpay_payment_id = event.razorpay_payment_id or order.razorpay_payment_id
+                order.updated_at = now
+                changed[order.id] = order
+                event.status = 'applied'
+
+        Order.objects.bulk_update(changed.values(), ['status', 'razorpay_payment_id', 'updated_at'])
+        PaymentEvent.objects.bulk_update(events, ['status', 'note', 'processed_at'])
+        # As verify_payment does; the webhook is there for clients that never call it
+        user_ids = {order.user_id for order in changed.values()}
+        if user_ids:
+            CartItem.objects.filter(user_id__in=user_ids).delete()
+            invalidate_cart_summary(*user_ids)
+    return len(events)
+
+def _captured_payment(razorpay_order_id):
+    try:
+        payments = get_gateway().fetch_order_payments(razorpay_order_id)
+    except GatewayError as exc:
+        return exc
+    finally:
+        close_old_connections()
+    return next((p for p in payments if p.get('status') == 'captured'), None)
+
+def reconcile_pending_orders(created_before, chunk_size=200, workers=8):
+    """
+    Ask the gateway about pending orders created before `created_before`,
+    a chunk at a time, and queue a `reconcile.captured` event for each one
+    that was actually paid. Returns (checked, captured); stops early if
+    the gateway becomes unavailable. Orders the gateway rejects (an id it
+    never issued) are logged and skipped.
+    """
+    checked = captured = 0
+    cursor = Q()
+    while True:
+        chunk = list(
+            Order.objects.filter(status='pending', created_at__lt=created_before)
+            .exclude(razorpay_order_id__isnull=True).exclude(razorpay_order_id='')
+            .filter(cursor).order_by('created_at', 'id')
+            .values_list('id', 'created_at', 'razorpay_order_id')[:chunk_size]
+        )
+        if not chunk:
+            return checked, captured
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_captured_payment, [row[2] for row in chunk]))
+
+        found, stopped = [], False
+        for (_, _, razorpay_order_id), result in zip(chunk, results):
+            if isinstance(result, GatewayRejected):
+                logger.warning("Skipping %s during reconciliation: %s", razorpay_order_id, result)
+                checked += 1
+                continue
+            if isinstance(result, GatewayError):
+                logger.warning("Reconciliation stopped: %s", result)
+                stopped = True
+                break
+            checked += 1
+            if result:
+                found.append(PaymentEvent(
+                    event_id=f"reconcile:{result['id']}",
+                    event='reconcile.captured',
+                    razorpay_order_id=razorpay_order_id,
+                    razorpay_payment_id=result['id'],
+                    payload=result,
+                ))
+        PaymentEvent.objects.bulk_create(found, ignore_conflicts=True)
+        captured += len(found)
+        if stopped:
+            return checked, captured
+        last_id, last_created, _ = chunk[-1]
+        cursor = Q(created_at__gt=last_created) | Q(created_at=last_created, id__gt=last_id)
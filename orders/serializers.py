@@ -1,26 +1,20 @@
 from rest_framework import serializers
 from .models import Order, OrderItem
-from products.serializers import ProductSerializer, ProductVariantSerializer
 from products.models import Product, ProductVariant
+from products.inventory import reserve_stock, InsufficientStock
 from django.db import transaction
 import random
 import string
 
 class OrderItemSerializer(serializers.ModelSerializer):
-    product_detail = serializers.SerializerMethodField()
-    variant_detail = serializers.SerializerMethodField()
+    """
+    Flat line representation for order history, read entirely from the
+    snapshot columns written at checkout.
+    """
 
     class Meta:
         model = OrderItem
-        fields = ['id', 'product', 'variant', 'quantity', 'unit_price', 'total_price', 'product_detail', 'variant_detail']
-
-    def get_product_detail(self, obj):
-        return ProductSerializer(obj.product).data
-
-    def get_variant_detail(self, obj):
-        if obj.variant:
-            return ProductVariantSerializer(obj.variant).data
-        return None
+        fields = ['id', 'product', 'variant', 'title', 'sku', 'color', 'size', 'quantity', 'unit_price', 'total_price']
 
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
@@ -33,46 +27,55 @@ class OrderSerializer(serializers.ModelSerializer):
 class OrderCreateSerializer(serializers.Serializer):
     """
     Creates an Order from user's cart
-    Computes total, stores Order with status 'pending'
+    Computes total, reserves stock, stores Order with status 'pending'
     Returns order info including razorpay_order_id
     """
     
     def create(self, validated_data):
         request = self.context['request']
         user = request.user
-        cart_items = user.cart_items.select_related('variant__product').all()
+        cart_items = list(user.cart_items.select_related('variant__product'))
         
         if not cart_items:
             raise serializers.ValidationError("Cart is empty.")
 
+        # Price every line once, before the write transaction is opened
+        items = []
+        total = 0
+        for cart_item in cart_items:
+            variant = cart_item.variant
+            unit_price = variant.price
+            total_price = unit_price * cart_item.quantity
+            total += total_price
+            items.append(OrderItem(
+                product=variant.product,
+                variant=variant,
+                title=variant.product.title,
+                sku=variant.sku,
+                color=variant.color,
+                size=variant.size,
+                quantity=cart_item.quantity,
+                unit_price=unit_price,
+                total_price=total_price
+            ))
+
+        # Generate razorpay order ID up front so the order is inserted once
+        razorpay_order_id = "order_" + ''.join(random.choices(string.ascii_letters + string.digits, k=14))
+
         with transaction.atomic():
-            # Calculate total from cart items
-            total = sum([item.quantity * item.variant.price for item in cart_items])
-            
-            # Create order
+            try:
+                reserve_stock((item.variant_id, item.quantity) for item in items)
+            except InsufficientStock as exc:
+                raise serializers.ValidationError(str(exc))
+
             order = Order.objects.create(
                 user=user, 
                 total_amount=total, 
-                status='pending'
+                status='pending',
+                razorpay_order_id=razorpay_order_id
             )
-
-            # Create order items from cart
-            for cart_item in cart_items:
-                unit_price = cart_item.variant.price
-                total_price = unit_price * cart_item.quantity
-                
-                OrderItem.objects.create(
-                    order=order,
-                    product=cart_item.variant.product,
-                    variant=cart_item.variant,
-                    quantity=cart_item.quantity,
-                    unit_price=unit_price,
-                    total_price=total_price
-                )
-            
-            # Generate razorpay order ID
-            razorpay_order_id = "order_" + ''.join(random.choices(string.ascii_letters + string.digits, k=14))
-            order.razorpay_order_id = razorpay_order_id
-            order.save()
+            for item in items:
+                item.order = order
+            OrderItem.objects.bulk_create(items)
             
-        return order
\ No newline at end of file
+        return order
@@ -0,0 +1,111 @@
+# orders/stub_gateway.py
+"""
+Minimal local stand-in for the Razorpay orders API (create an order,
+list an order's payments), for tests and load runs. Point
+RAZORPAY_BASE_URL at `stub.url` (any key id/secret works).
+
+    python -m orders.stub_gateway --port 8765 --delay 0.05
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubGateway:
+    def __init__(self, port=0, delay=0.0):
+        self.delay = delay
+        self.fail_next = 0
+        self.requests = 0
+        # razorpay order id -> list of payment dicts returned by /payments
+        self.payments = {}
+        # razorpay order ids answered with a 400, as for ids Razorpay never issued
+        self.unknown_orders = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if self.path.rstrip('/') != '/v1/orders':
+                    return self.reply(404, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'Not found'}})
+                if stub.fail_next:
+                    stub.fail_next -= 1
+                    return self.reply(500, {'error': {'code': 'SERVER_ERROR', 'description': 'Stub failure'}})
+                data = json.loads(body or b'{}')
+                if not data.get('amount'):
+                    return self.reply(400, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'amount is required'}})
+                self.reply(200, {
+                    'id': f"order_{uuid.uuid4().hex[:14]}",
+                    'entity': 'order',
+                    'amount': data['amount'],
+                    'currency': data.get('currency', 'INR'),
+                    'receipt': data.get('receipt'),
+                    'status': 'created',
+                })
+
+            def do_GET(self):
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                parts = self.path.split('?')[0].strip('/').split('/')
+                if len(parts) != 4 or parts[:2] != ['v1', 'orders'] or parts[3] != 'payments':
+                    return self.reply(404, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'Not found'}})
+                if stub.fail_next:
+                    stub.fail_next -= 1
+                    return self.reply(500, {'error': {'code': 'SERVER_ERROR', 'description': 'Stub failure'}})
+                if parts[2] in stub.unknown_orders:
+                    return self.reply(400, {
+                        'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'The id provided does not exist'}
+                    })
+                items = stub.payments.get(parts[2], [])
+                self.reply(200, {'entity': 'collection', 'count': len(items), 'items': items})
+
+            def reply(self, status, payload):
+                raw = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(raw)))
+                    self.end_headers()
+                    self.wfile.write(raw)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timeout)
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a local stub of the Razorpay orders API.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds to wait before each response.")
+    args = parser.parse_args()
+    stub = StubGateway(args.port, args.delay)
+    print(f"Stub gateway listening on {stub.url}")
+    stub.server.serve_forever()
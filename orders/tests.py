@@ -1,3 +1,455 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from products.models import Category, Product, ProductVariant, CartItem
+from .gateway import CircuitBreaker, GatewayUnavailable, RazorpayGateway, get_gateway
+from .models import IdempotencyKey, Order, OrderItem, PaymentEvent
+from .payments import apply_payment_events, reconcile_pending_orders
+from .stub_gateway import StubGateway
+from .utils import expire_pending_orders
+
+User = get_user_model()
+
+
+class PlaceOrderTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Bags', slug='bags')
+        self.product = Product.objects.create(category=category, title='Tote')
+        self.variants = [
+            ProductVariant.objects.create(product=self.product, sku=f'TOTE-{i}', price=Decimal('12.50'), stock=10)
+            for i in range(3)
+        ]
+        for variant in self.variants:
+            CartItem.objects.create(user=self.user, variant=variant, quantity=2)
+
+    def test_place_order_creates_priced_items(self):
+        response = self.client.post('/api/orders/orders/place_order/')
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.data['order_id'])
+        self.assertEqual(order.total_amount, Decimal('75.00'))
+        self.assertTrue(order.razorpay_order_id.startswith('order_'))
+        self.assertEqual(order.items.count(), 3)
+        self.assertEqual(
+            set(OrderItem.objects.values_list('total_price', flat=True)), {Decimal('25.00')}
+        )
+
+    def test_place_order_with_empty_cart(self):
+        CartItem.objects.all().delete()
+        response = self.client.post('/api/orders/orders/place_order/')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_place_order_reserves_stock(self):
+        self.client.post('/api/orders/orders/place_order/')
+        self.assertEqual(
+            list(ProductVariant.objects.values_list('stock', flat=True)), [8, 8, 8]
+        )
+
+    def test_place_order_rejects_insufficient_stock(self):
+        ProductVariant.objects.filter(pk=self.variants[1].pk).update(stock=1)
+        response = self.client.post('/api/orders/orders/place_order/')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(
+            list(ProductVariant.objects.order_by('id').values_list('stock', flat=True)), [10, 1, 10]
+        )
+
+    def test_expired_reservation_releases_stock(self):
+        order_id = self.client.post('/api/orders/orders/place_order/').data['order_id']
+        Order.objects.filter(pk=order_id).update(created_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(expire_pending_orders(timezone.now() - timedelta(minutes=15)), 1)
+        self.assertEqual(Order.objects.get(pk=order_id).status, 'cancelled')
+        self.assertEqual(
+            list(ProductVariant.objects.values_list('stock', flat=True)), [10, 10, 10]
+        )
+
+        response = self.client.post('/api/orders/orders/verify_payment/', {'order_id': order_id})
+        self.assertEqual(response.status_code, 409)
+
+    def test_order_history_supports_conditional_get(self):
+        order_id = self.client.post('/api/orders/orders/place_order/').data['order_id']
+        first = self.client.get('/api/orders/orders/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(
+            self.client.get('/api/orders/orders/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304
+        )
+
+        self.client.post('/api/orders/orders/verify_payment/', {'order_id': order_id})
+        self.assertEqual(
+            self.client.get('/api/orders/orders/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200
+        )
+
+    def test_order_history_query_count_is_fixed(self):
+        self.client.post('/api/orders/orders/place_order/')
+        with CaptureQueriesContext(connection) as one_order:
+            response = self.client.get('/api/orders/orders/')
+        item = response.data['results'][0]['items'][0]
+        self.assertEqual(item['title'], 'Tote')
+        self.assertTrue(item['sku'].startswith('TOTE-'))
+
+        for _ in range(4):
+            self.client.post('/api/orders/orders/place_order/')
+        with CaptureQueriesContext(connection) as five_orders:
+            response = self.client.get('/api/orders/orders/')
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(one_order.captured_queries), len(five_orders.captured_queries))
+
+    def test_history_survives_catalog_edits_and_deletes(self):
+        self.client.post('/api/orders/orders/place_order/')
+        self.product.title = 'Renamed tote'
+        self.product.save()
+        self.product.delete()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/orders/orders/')
+        items = response.data['results'][0]['items']
+        self.assertEqual({item['title'] for item in items}, {'Tote'})
+        self.assertEqual({item['product'] for item in items}, {None})
+        self.assertFalse(any('products_' in q['sql'] for q in ctx.captured_queries))
+
+    def test_async_order_history(self):
+        self.client.post('/api/orders/orders/place_order/')
+        self.client.post('/api/orders/orders/place_order/')
+        response = self.client.get(
+            '/api/orders/async/orders/?page_size=1', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}'
+        )
+        body = response.json()
+        self.assertEqual(len(body['results']), 1)
+        self.assertEqual(len(body['results'][0]['items']), 3)
+        self.assertIn('before=', body['next'])
+
+
+GATEWAY_SETTINGS = dict(
+    RAZORPAY_KEY_ID='rzp_test_stub', RAZORPAY_KEY_SECRET='stub-secret', RAZORPAY_RETRY_BACKOFF=0,
+    RAZORPAY_CONNECT_TIMEOUT=1, RAZORPAY_READ_TIMEOUT=0.3, RAZORPAY_MAX_RETRIES=2, RAZORPAY_BREAKER_THRESHOLD=3,
+)
+
+
+class GatewayTests(APITestCase):
+    def setUp(self):
+        self.stub = StubGateway().start()
+        self.addCleanup(self.stub.stop)
+        overrides = override_settings(RAZORPAY_BASE_URL=self.stub.url, **GATEWAY_SETTINGS)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user(username='payer', email='payer@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+
+    def create(self, amount='10.50'):
+        return self.client.post('/api/orders/create-order/', {'amount': amount})
+
+    def test_create_order_through_stub(self):
+        response = self.create()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['amount'], 1050)
+        stats = get_gateway().stats.snapshot()['order.create']
+        self.assertEqual((stats['calls'], stats['errors']), (1, 0))
+
+    def test_server_errors_are_retried(self):
+        self.stub.fail_next = 2
+        self.assertEqual(self.create().status_code, 200)
+        self.assertEqual(self.stub.requests, 3)
+        self.assertEqual(get_gateway().stats.snapshot()['order.create']['errors'], 2)
+
+    def test_read_timeout_on_create_is_not_repeated(self):
+        self.stub.delay = 1
+        self.assertEqual(self.create().status_code, 503)
+        self.assertEqual(self.stub.requests, 1)
+
+    def test_breaker_opens_and_fails_fast(self):
+        self.stub.fail_next = 100
+        self.assertEqual(self.create().status_code, 503)
+        self.assertEqual(self.stub.requests, 3)
+        self.assertEqual(get_gateway().breaker.state, 'open')
+        # Rejected locally without touching the gateway
+        self.assertEqual(self.create().status_code, 503)
+        self.assertEqual(self.stub.requests, 3)
+
+    def test_breaker_half_open_trial_closes_it(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'half-open')
+        breaker.before_call()
+        with self.assertRaises(GatewayUnavailable):
+            breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_unexpected_error_in_half_open_trial_does_not_wedge_breaker(self):
+        gateway = RazorpayGateway('rzp_test_stub', 'stub-secret', base_url=self.stub.url, backoff=0,
+                                  breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+        gateway.breaker.record_failure()
+
+        def malformed():
+            raise KeyError('id')
+
+        with self.assertRaises(KeyError):
+            gateway._call('order.create', malformed)
+        # The failed trial re-opens the breaker (half-open again at once
+        # here), so the next call is let through instead of being refused
+        self.assertEqual(gateway.breaker.state, 'half-open')
+        self.assertEqual(gateway._call('order.fetch', lambda: {'id': 'order_1'}), {'id': 'order_1'})
+        self.assertEqual(gateway.breaker.state, 'closed')
+
+
+@override_settings(RAZORPAY_KEY_ID='', RAZORPAY_KEY_SECRET='')
+class OfflineGatewayTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='offline', email='offline@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+
+    def verify(self, signature):
+        return self.client.post('/api/orders/verify-payment/', {
+            'razorpay_order_id': 'order_test_1', 'razorpay_payment_id': 'pay_1', 'razorpay_signature': signature,
+        })
+
+    def test_forged_signature_is_rejected(self):
+        self.assertEqual(self.verify('forged').status_code, 400)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.verify('forged').status_code, 400)
+
+    @override_settings(DEBUG=True)
+    def test_dev_signature_is_accepted_in_debug(self):
+        signature = hmac.new(b'', b'order_test_1|pay_1', hashlib.sha256).hexdigest()
+        self.assertEqual(self.verify(signature).status_code, 200)
+
+
+class IdempotencyKeyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='retrier', email='retrier@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        product = Product.objects.create(category=Category.objects.create(name='Mugs', slug='mugs'), title='Mug')
+        variant = ProductVariant.objects.create(product=product, sku='MUG', price=Decimal('8.00'), stock=10)
+        CartItem.objects.create(user=self.user, variant=variant, quantity=2)
+
+    def place(self, key, **data):
+        return self.client.post('/api/orders/orders/place_order/', data, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        first = self.place('checkout-1')
+        retry = self.place('checkout-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.data), (201, first.data))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(OrderItem.objects.count(), 1)
+
+        paid = self.client.post('/api/orders/orders/verify_payment/', {'order_id': first.data['order_id']},
+                                HTTP_IDEMPOTENCY_KEY='pay-1')
+        again = self.client.post('/api/orders/orders/verify_payment/', {'order_id': first.data['order_id']},
+                                 HTTP_IDEMPOTENCY_KEY='pay-1')
+        self.assertEqual((paid.status_code, again.data), (200, paid.data))
+
+    def test_key_reused_for_different_request(self):
+        self.place('checkout-2')
+        self.assertEqual(self.place('checkout-2', note='changed').status_code, 422)
+
+    def test_expired_key_runs_again(self):
+        self.place('checkout-3')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        # Cart still holds the items, so a fresh run creates a second order
+        self.assertNotIn('Idempotent-Replayed', self.place('checkout-3'))
+        self.assertEqual(Order.objects.count(), 2)
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0.3)
+    def test_duplicate_waits_then_gets_409_if_still_in_flight(self):
+        first = self.place('checkout-4')
+        self.assertEqual(first.status_code, 201)
+        IdempotencyKey.objects.filter(key='checkout-4').update(status_code=None, response_body=None)
+        started = time.monotonic()
+        response = self.place('checkout-4')
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class IdempotencyConcurrencyTests(TransactionTestCase):
+    def test_concurrent_duplicates_create_one_order(self):
+        user = User.objects.create_user(username='stormy', email='stormy@example.com', password='pass12345')
+        product = Product.objects.create(category=Category.objects.create(name='Pens', slug='pens'), title='Pen')
+        variant = ProductVariant.objects.create(product=product, sku='PEN', price=Decimal('2.00'), stock=100)
+        CartItem.objects.create(user=user, variant=variant, quantity=3)
+
+        results = []
+
+        def retry():
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                response = client.post('/api/orders/orders/place_order/', HTTP_IDEMPOTENCY_KEY='storm')
+                results.append((response.status_code, response.data.get('order_id')))
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=retry) for _ in range(6)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(Order.objects.count(), 1)
+        order_id = Order.objects.get().id
+        self.assertEqual(results, [(201, order_id)] * 6)
+        self.assertEqual(ProductVariant.objects.get(pk=variant.pk).stock, 97)
+
+
+@override_settings(RAZORPAY_WEBHOOK_SECRET='whsec')
+class PaymentWebhookTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hooked', email='hooked@example.com', password='pass12345')
+        self.orders = [
+            Order.objects.create(user=self.user, total_amount=Decimal('10.00'), razorpay_order_id=f'order_hook{i}')
+            for i in range(3)
+        ]
+
+    def deliver(self, event, razorpay_order_id, payment_id, event_id=None, secret='whsec'):
+        body = json.dumps({'event': event, 'payload': {'payment': {'entity': {
+            'id': payment_id, 'order_id': razorpay_order_id, 'status': 'captured',
+        }}}}).encode()
+        headers = {'HTTP_X_RAZORPAY_SIGNATURE': hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()}
+        if event_id:
+            headers['HTTP_X_RAZORPAY_EVENT_ID'] = event_id
+        return self.client.post('/api/orders/webhooks/razorpay/', body, content_type='application/json', **headers)
+
+    def test_rejects_bad_signature(self):
+        self.assertEqual(self.deliver('payment.captured', 'order_hook0', 'pay_0', secret='wrong').status_code, 400)
+        self.assertFalse(PaymentEvent.objects.exists())
+
+    def test_events_are_queued_then_applied_in_one_batch(self):
+        self.assertEqual(self.deliver('payment.captured', 'order_hook0', 'pay_0', 'evt_0').status_code, 200)
+        # Redelivery of the same event is dropped
+        self.assertEqual(self.deliver('payment.captured', 'order_hook0', 'pay_0', 'evt_0').status_code, 200)
+        self.deliver('payment.captured', 'order_hook1', 'pay_1', 'evt_1')
+        self.deliver('payment.failed', 'order_hook2', 'pay_2', 'evt_2')
+        self.assertEqual(PaymentEvent.objects.count(), 3)
+        self.assertEqual(Order.objects.filter(status='placed').count(), 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(apply_payment_events(), 3)
+        self.assertLessEqual(len(queries), 8)
+        self.assertEqual(
+            dict(Order.objects.values_list('razorpay_order_id', 'razorpay_payment_id')),
+            {'order_hook0': 'pay_0', 'order_hook1': 'pay_1', 'order_hook2': None},
+        )
+        self.assertEqual(Order.objects.get(razorpay_order_id='order_hook2').status, 'pending')
+        self.assertEqual(apply_payment_events(), 0)
+
+    def test_applied_capture_empties_the_cart(self):
+        cache.clear()
+        product = Product.objects.create(category=Category.objects.create(name='Hats', slug='hats'), title='Hat')
+        variant = ProductVariant.objects.create(product=product, sku='HAT', price=Decimal('5.00'), stock=10)
+        other = User.objects.create_user(username='bystander', email='bystander@example.com', password='pass12345')
+        CartItem.objects.create(user=self.user, variant=variant, quantity=2)
+        CartItem.objects.create(user=other, variant=variant, quantity=1)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/products/cart/summary/').data['item_count'], 2)
+
+        self.deliver('payment.captured', 'order_hook0', 'pay_0', 'evt_0')
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_payment_events()
+        self.assertEqual(list(CartItem.objects.values_list('user_id', flat=True)), [other.id])
+        self.assertEqual(self.client.get('/api/products/cart/summary/').data['item_count'], 0)
+
+    def test_capture_for_cancelled_order_is_ignored(self):
+        Order.objects.filter(pk=self.orders[0].pk).update(status='cancelled')
+        self.deliver('payment.captured', 'order_hook0', 'pay_late', 'evt_late')
+        apply_payment_events()
+        self.assertEqual(Order.objects.get(pk=self.orders[0].pk).status, 'cancelled')
+        self.assertEqual(PaymentEvent.objects.get().note, 'order is cancelled')
+
+    def test_reconcile_pending_orders_against_gateway(self):
+        Order.objects.update(created_at=timezone.now() - timedelta(minutes=30))
+        with StubGateway() as stub, override_settings(RAZORPAY_BASE_URL=stub.url, **GATEWAY_SETTINGS):
+            stub.payments['order_hook1'] = [
+                {'id': 'pay_failed', 'status': 'failed'}, {'id': 'pay_ok', 'status': 'captured'},
+            ]
+            out = StringIO()
+            call_command('reconcile_pending_orders', '--chunk-size', '2', stdout=out)
+            self.assertEqual(stub.requests, 3)
+        self.assertIn('Checked 3 pending order(s); 1 were paid', out.getvalue())
+        order = Order.objects.get(razorpay_order_id='order_hook1')
+        self.assertEqual((order.status, order.razorpay_payment_id), ('placed', 'pay_ok'))
+        self.assertEqual(Order.objects.filter(status='pending').count(), 2)
+
+    def test_reconcile_skips_orders_the_gateway_rejects(self):
+        Order.objects.update(created_at=timezone.now() - timedelta(minutes=30))
+        Order.objects.filter(razorpay_order_id='order_hook0').update(created_at=timezone.now() - timedelta(days=1))
+        with StubGateway() as stub, override_settings(RAZORPAY_BASE_URL=stub.url, **GATEWAY_SETTINGS):
+            stub.unknown_orders.add('order_hook0')
+            stub.payments['order_hook2'] = [{'id': 'pay_2', 'status': 'captured'}]
+            self.assertEqual(reconcile_pending_orders(timezone.now(), chunk_size=1), (3, 1))
+        self.assertEqual(PaymentEvent.objects.get().razorpay_order_id, 'order_hook2')
+
+    def test_webhook_with_malformed_payload(self):
+        def post(payload):
+            body = json.dumps(payload).encode()
+            return self.client.post(
+                '/api/orders/webhooks/razorpay/', body, content_type='application/json',
+                HTTP_X_RAZORPAY_SIGNATURE=hmac.new(b'whsec', body, hashlib.sha256).hexdigest(),
+            )
+
+        self.assertEqual(post([1, 2]).status_code, 400)
+        # Queued without ids; the worker then ignores it as an unknown order
+        self.assertEqual(post({'event': 'payment.captured', 'payload': 'oops'}).status_code, 200)
+        self.assertEqual(post({'event': 'order.paid', 'payload': {'order': []}}).status_code, 200)
+        self.assertEqual(set(PaymentEvent.objects.values_list('razorpay_order_id', flat=True)), {''})
+
+
+class SeedPerfDataTests(APITestCase):
+    def seed(self, *extra):
+        call_command(
+            'seed_perf_data', '--users', '5', '--categories', '2', '--products', '6', '--variants-per-product', '2',
+            '--cart-items-per-user', '2', '--orders', '7', '--items-per-order', '2', '--batch-size', '4', *extra,
+            stdout=StringIO(),
+        )
+
+    def snapshot(self):
+        return list(OrderItem.objects.order_by('order__created_at', 'id').values_list('sku', 'quantity', 'unit_price'))
+
+    def test_generates_consistent_data_from_seed(self):
+        self.seed()
+        self.assertEqual(User.objects.filter(username__startswith='perf_user_').count(), 5)
+        self.assertEqual(ProductVariant.objects.count(), 12)
+        self.assertEqual(CartItem.objects.count(), 10)
+        self.assertEqual(Order.objects.count(), 7)
+        order = Order.objects.first()
+        self.assertEqual(order.total_amount, sum(i.total_price for i in order.items.all()))
+        first = self.snapshot()
+
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed('--clear')
+        self.assertEqual(Order.objects.count(), 7)
+        self.assertEqual(len(self.snapshot()), len(first))
+        self.assertEqual([row[1:] for row in self.snapshot()], [row[1:] for row in first])
+
+
+class BenchPlaceOrderTests(APITestCase):
+    def test_reports_percentiles_and_rolls_back(self):
+        out = StringIO()
+        call_command('bench_place_order', '--sizes', '1', '--runs', '2', stdout=out)
+        self.assertIn('cart lines=1', out.getvalue())
+        self.assertFalse(Order.objects.exists())
+
+    def test_single_run_is_rejected(self):
+        with self.assertRaisesMessage(CommandError, '--runs must be at least 2'):
+            call_command('bench_place_order', '--runs', '1', stdout=StringIO())
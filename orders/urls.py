@@ -1,14 +1,19 @@
 # orders/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import OrderViewSet, CreateRazorpayOrderView, VerifyRazorpayPaymentView
+from .views import OrderViewSet, CreateRazorpayOrderView, VerifyRazorpayPaymentView, RazorpayWebhookView
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'orders', OrderViewSet, basename='orders')
 
 urlpatterns = [
     path('', include(router.urls)),
+    # Async (ASGI-native) order history
+    path('async/orders/', async_views.order_history, name='async-order-history'),
     # Legacy endpoints (keep for compatibility)
     path('create-order/', CreateRazorpayOrderView.as_view(), name='create-order'),
     path('verify-payment/', VerifyRazorpayPaymentView.as_view(), name='verify-payment'),
+    # Razorpay server-to-server notifications
+    path('webhooks/razorpay/', RazorpayWebhookView.as_view(), name='razorpay-webhook'),
 ]
\ No newline at end of file
@@ -0,0 +1,35 @@
+# orders/utils.py
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from products.inventory import release_stock
+from .models import Order, OrderItem
+
+def expire_pending_orders(created_before, chunk_size=500):
+    """
+    Cancel unpaid orders created before `created_before` and return their
+    reserved stock. Works through the backlog in chunks; returns the number
+    of orders cancelled.
+    """
+    expired = 0
+    while True:
+        ids = list(
+            Order.objects.filter(status='pending', created_at__lt=created_before)
+            .order_by('created_at', 'id').values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return expired
+
+        with transaction.atomic():
+            # Re-check under lock: the order may have been paid meanwhile
+            claimed = list(
+                Order.objects.select_for_update()
+                .filter(id__in=ids, status='pending').values_list('id', flat=True)
+            )
+            Order.objects.filter(id__in=claimed).update(status='cancelled', updated_at=timezone.now())
+            lines = (
+                OrderItem.objects.filter(order_id__in=claimed, variant__isnull=False)
+                .values('variant_id').annotate(quantity=Sum('quantity'))
+            )
+            release_stock((line['variant_id'], line['quantity']) for line in lines)
+        expired += len(claimed)
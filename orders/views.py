@@ -1,32 +1,31 @@
 from rest_framework import viewsets, status
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.conf import settings
-import razorpay
+from django.db import transaction
+from django.db.models import Count, Max
 from decimal import Decimal
-import random
-import string
 
 from .models import Order, OrderItem
 from .serializers import OrderSerializer, OrderCreateSerializer
 from products.models import CartItem
+from core.mixins import ConditionalListMixin
+from .gateway import GatewayRejected, GatewayUnavailable, get_gateway
+from .idempotency import idempotent
+from .payments import enqueue_webhook, verify_webhook_signature
 
-# Initialize Razorpay client
-try:
-    client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
-except:
-    client = None
-
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user).prefetch_related('items')
+        return Order.objects.filter(user=self.request.user).for_history()
 
     @action(detail=False, methods=['post'])
+    @idempotent
     def place_order(self, request):
         """Create order from cart items"""
         serializer = OrderCreateSerializer(data=request.data, context={'request': request})
@@ -41,6 +40,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['post'])
+    @idempotent
     def verify_payment(self, request):
         """Verify payment and clear cart"""
         data = request.data
@@ -50,11 +50,19 @@ class OrderViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'Order ID is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            order = Order.objects.get(id=order_id, user=request.user)
-            
-            # For testing, simulate successful payment
-            order.status = 'placed'
-            order.save()
+            with transaction.atomic():
+                order = Order.objects.select_for_update().get(id=order_id, user=request.user)
+                if order.status not in ('pending', 'placed'):
+                    # Reservation expired or order cancelled; stock has been released
+                    return Response({
+                        'detail': 'Order is no longer payable. Please place the order again.',
+                        'order_id': order.id,
+                        'status': order.status
+                    }, status=status.HTTP_409_CONFLICT)
+
+                # For testing, simulate successful payment
+                order.status = 'placed'
+                order.save()
             
             # Clear user's cart
             CartItem.objects.filter(user=request.user).delete()
@@ -68,11 +76,10 @@ class OrderViewSet(viewsets.ModelViewSet):
         except Order.DoesNotExist:
             return Response({'detail': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    def list(self, request):
-        """Get user's order history"""
-        orders = self.get_queryset().order_by('-created_at')
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+    def get_list_version(self, queryset):
+        # Per user and covered by order_user_updated_idx
+        version = queryset.aggregate(last=Max('updated_at'), count=Count('id'))
+        return f"{version['last']}:{version['count']}"
 
     def retrieve(self, request, pk=None):
         """Get specific order details"""
@@ -87,6 +94,7 @@ class OrderViewSet(viewsets.ModelViewSet):
 class CreateRazorpayOrderView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @idempotent
     def post(self, request):
         amount = request.data.get('amount')
         if not amount:
@@ -94,21 +102,15 @@ class CreateRazorpayOrderView(APIView):
         
         try:
             amount_paisa = int(Decimal(str(amount)) * 100)
-            data = {
-                'amount': amount_paisa,
-                'currency': 'INR',
-                'payment_capture': 1
-            }
-            if client:
-                order = client.order.create(data=data)
-            else:
-                # Fallback for testing
-                order = {
-                    "id": "order_test_" + ''.join(random.choices(string.ascii_letters + string.digits, k=10)),
-                    "amount": amount_paisa,
-                    "currency": "INR"
-                }
+            order = get_gateway().create_order(amount_paisa)
             return Response(order)
+        except GatewayUnavailable:
+            return Response(
+                {"detail": "Payment gateway is unavailable. Please try again shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        except GatewayRejected as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -122,8 +124,25 @@ class VerifyRazorpayPaymentView(APIView):
             'razorpay_signature': request.data.get('razorpay_signature'),
         }
         try:
-            if client:
-                client.utility.verify_payment_signature(payload)
+            get_gateway().verify_payment_signature(payload)
             return Response({"detail": "Payment verified successfully"})
         except Exception as e:
-            return Response({"detail": "Invalid signature", "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response({"detail": "Invalid signature", "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class RazorpayWebhookView(APIView):
+    """
+    Razorpay webhook receiver. Only verifies and queues the event; the
+    `apply_payment_events` worker updates the order.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        body = request.body
+        if not verify_webhook_signature(body, request.headers.get('X-Razorpay-Signature')):
+            return Response({"detail": "Invalid signature"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            enqueue_webhook(body, request.headers.get('X-Razorpay-Event-Id'))
+        except ValueError:
+            return Response({"detail": "Invalid payload"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"detail": "Queued"})
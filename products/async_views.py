@@ -0,0 +1,49 @@
+# products/async_views.py
+"""
+Async-native read endpoints for ASGI deployments, served alongside the
+DRF viewsets under /api/products/async/. They use the async ORM and never
+hold a worker thread while waiting on the database.
+"""
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+from core.async_auth import jwt_required
+from core.pagination import akeyset_page
+from .cache import catalog_cache
+from .models import Category, Product, CartItem
+from .serializers import CategorySerializer, ProductSerializer, CartItemSerializer
+
+async def _page(request, queryset, serializer_class):
+    try:
+        return JsonResponse(await akeyset_page(request, queryset, serializer_class))
+    except ValueError:
+        return JsonResponse({"detail": "Invalid page parameters."}, status=400)
+
+@require_GET
+@jwt_required
+async def product_list(request):
+    return await _page(request, Product.objects.for_catalog(), ProductSerializer)
+
+@require_GET
+@jwt_required
+async def product_detail(request, pk):
+    async def build():
+        try:
+            product = await Product.objects.for_catalog().aget(pk=pk)
+        except Product.DoesNotExist:
+            raise Http404
+        return ProductSerializer(product).data
+
+    try:
+        return JsonResponse(await catalog_cache.aget_or_set('product', pk, build))
+    except Http404:
+        return JsonResponse({"detail": "No Product matches the given query."}, status=404)
+
+@require_GET
+@jwt_required
+async def category_list(request):
+    return await _page(request, Category.objects.all(), CategorySerializer)
+
+@require_GET
+@jwt_required
+async def cart_list(request):
+    return await _page(request, CartItem.objects.filter(user=request.user).select_related('variant'), CartItemSerializer)
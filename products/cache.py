@@ -0,0 +1,120 @@
+# products/cache.py
+import threading
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from core.metrics import counter
+
+class CatalogCache:
+    """
+    Read-through cache for serialized catalog payloads.
+    Entries are keyed by kind and primary key, versioned with
+    CATALOG_CACHE_VERSION (bump it when a serializer's output changes),
+    and dropped by the signal handlers in products/signals.py. Every
+    invalidation also moves the catalog list version used for list ETags.
+    """
+
+    LIST_VERSION_KEY = 'catalog:list-version'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[settings.CATALOG_CACHE_ALIAS]
+
+    def key(self, kind, pk):
+        return f"catalog:{kind}:{pk}"
+
+    def get_or_set(self, kind, pk, build):
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            # Not a valid id; let the view raise its usual 404
+            return build()
+        key = self.key(kind, pk)
+        data = self.backend.get(key, version=settings.CATALOG_CACHE_VERSION)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            data = build()
+            self.backend.set(key, data, settings.CATALOG_CACHE_TIMEOUT, version=settings.CATALOG_CACHE_VERSION)
+        return data
+
+    async def aget_or_set(self, kind, pk, abuild):
+        """Async variant of get_or_set; `abuild` is a coroutine function."""
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return await abuild()
+        key = self.key(kind, pk)
+        data = await self.backend.aget(key, version=settings.CATALOG_CACHE_VERSION)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            data = await abuild()
+            await self.backend.aset(key, data, settings.CATALOG_CACHE_TIMEOUT, version=settings.CATALOG_CACHE_VERSION)
+        return data
+
+    def list_version(self):
+        value = self.backend.get(self.LIST_VERSION_KEY)
+        if value is None:
+            # Evicted or never set: start from a fresh random value so no old
+            # ETag can match again
+            fresh = uuid.uuid4().hex
+            added = self.backend.add(self.LIST_VERSION_KEY, fresh, None)
+            value = fresh if added else self.backend.get(self.LIST_VERSION_KEY, fresh)
+        return value
+
+    def bump_list_version(self):
+        self.backend.set(self.LIST_VERSION_KEY, uuid.uuid4().hex, None)
+
+    def invalidate(self, kind, pk):
+        key = self.key(kind, pk)
+        version = settings.CATALOG_CACHE_VERSION
+        self.backend.delete(key, version=version)
+        self.bump_list_version()
+        # Delete again once the write is visible, in case a concurrent read
+        # re-cached the old row before the transaction committed
+        def after_commit():
+            self.backend.delete(key, version=version)
+            self.bump_list_version()
+
+        transaction.on_commit(after_commit)
+
+    def invalidate_many(self, kind, pks):
+        """Bulk counterpart of `invalidate` for writes that bypass signals."""
+        keys = [self.key(kind, pk) for pk in pks]
+        if not keys:
+            return
+        version = settings.CATALOG_CACHE_VERSION
+        self.backend.delete_many(keys, version=version)
+        self.bump_list_version()
+
+        def after_commit():
+            self.backend.delete_many(keys, version=version)
+            self.bump_list_version()
+
+        transaction.on_commit(after_commit)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+catalog_cache = CatalogCache()
+
+def collect_metrics():
+    stats = catalog_cache.stats()
+    return [
+        counter('catalog_cache_hits_total', 'Catalog cache hits.', [({}, stats['hits'])]),
+        counter('catalog_cache_misses_total', 'Catalog cache misses.', [({}, stats['misses'])]),
+    ]
@@ -0,0 +1,153 @@
+# products/cart.py
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum, Window
+from django.utils import timezone
+from .models import CartItem
+
+CENT = Decimal('0.01')
+
+def cart_summary_key(user_id):
+    return f"cart-summary:{user_id}"
+
+def invalidate_cart_summary(*user_ids):
+    keys = [cart_summary_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # Delete again once the write is visible, in case a concurrent read
+    # re-cached the old summary before the transaction committed
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+def _money(value):
+    return str((value or Decimal('0')).quantize(CENT))
+
+def build_cart_summary(user_id):
+    """
+    Lines and totals in one query: per-line prices come from the join on
+    the variant, and cart-wide counts and subtotal from window aggregates
+    over the same rows.
+    """
+    line_total = ExpressionWrapper(
+        F('quantity') * F('variant__price'), output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+    rows = list(
+        CartItem.objects.filter(user_id=user_id)
+        .order_by('-added_at', '-id')
+        .values('id', 'variant_id', 'quantity')
+        .annotate(
+            unit_price=F('variant__price'),
+            line_total=line_total,
+            subtotal=Window(Sum(line_total)),
+            item_count=Window(Sum('quantity')),
+            line_count=Window(Count('id')),
+        )
+    )
+    first = rows[0] if rows else {}
+    return {
+        'line_count': first.get('line_count', 0),
+        'item_count': first.get('item_count', 0),
+        'subtotal': _money(first.get('subtotal')),
+        'lines': [
+            {
+                'id': row['id'],
+                'variant_id': row['variant_id'],
+                'quantity': row['quantity'],
+                'unit_price': _money(row['unit_price']),
+                'line_total': _money(row['line_total']),
+            }
+            for row in rows
+        ],
+    }
+
+def get_cart_summary(user_id):
+    timeout = settings.CART_SUMMARY_CACHE_TIMEOUT
+    if not timeout:
+        return build_cart_summary(user_id)
+    key = cart_summary_key(user_id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_cart_summary(user_id)
+        cache.set(key, summary, timeout)
+    return summary
+
+def increment_cart_items(user_id, quantities):
+    """
+    Add quantities ({variant_id: n}) to a user's cart atomically. Each row
+    is created or incremented in the database, never read-modify-written,
+    so concurrent adds for the same line cannot lose updates.
+    """
+    if not quantities:
+        return
+    if connection.vendor in ('sqlite', 'postgresql'):
+        _upsert_increment(user_id, quantities)
+    else:
+        for variant_id, quantity in sorted(quantities.items()):
+            _increment_one(user_id, variant_id, quantity)
+    invalidate_cart_summary(user_id)
+
+def _upsert_increment(user_id, quantities):
+    table = connection.ops.quote_name(CartItem._meta.db_table)
+    now = timezone.now()
+    rows = sorted(quantities.items())
+    values = ', '.join(['(%s, %s, %s, %s)'] * len(rows))
+    params = []
+    for variant_id, quantity in rows:
+        params.extend([user_id, variant_id, quantity, now])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (user_id, variant_id, quantity, added_at) VALUES {values} "
+            f"ON CONFLICT (user_id, variant_id) DO UPDATE SET quantity = {table}.quantity + excluded.quantity",
+            params,
+        )
+
+def _increment_one(user_id, variant_id, quantity):
+    items = CartItem.objects.filter(user_id=user_id, variant_id=variant_id)
+    if items.update(quantity=F('quantity') + quantity):
+        return
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(user_id=user_id, variant_id=variant_id, quantity=quantity)
+    except IntegrityError:
+        # Another request created the line first
+        items.update(quantity=F('quantity') + quantity)
+
+def set_cart_items(user_id, quantities):
+    """Set absolute quantities ({variant_id: n}); a quantity of 0 removes the line."""
+    removed = [variant_id for variant_id, quantity in quantities.items() if quantity == 0]
+    kept = sorted((v, q) for v, q in quantities.items() if q > 0)
+    if removed:
+        CartItem.objects.filter(user_id=user_id, variant_id__in=removed).delete()
+    if kept:
+        CartItem.objects.bulk_create(
+            [CartItem(user_id=user_id, variant_id=variant_id, quantity=quantity) for variant_id, quantity in kept],
+            update_conflicts=True,
+            unique_fields=['user', 'variant'],
+            update_fields=['quantity'],
+        )
+    invalidate_cart_summary(user_id)
+
+def apply_cart_operations(user_id, operations):
+    """
+    Fold a list of add/set/remove operations into at most one delete, one
+    absolute upsert and one increment upsert, applied in one transaction.
+    """
+    increments, absolutes = {}, {}
+    for operation in operations:
+        variant_id, quantity = operation['variant_id'], operation['quantity']
+        if operation['op'] == 'remove':
+            increments.pop(variant_id, None)
+            absolutes[variant_id] = 0
+        elif operation['op'] == 'set':
+            increments.pop(variant_id, None)
+            absolutes[variant_id] = quantity
+        elif variant_id in absolutes:
+            absolutes[variant_id] += quantity
+        else:
+            increments[variant_id] = increments.get(variant_id, 0) + quantity
+
+    with transaction.atomic():
+        set_cart_items(user_id, absolutes)
+        increment_cart_items(user_id, increments)
@@ -0,0 +1,305 @@
+# products/catalog_io.py
+"""
+Streaming catalog import/export, one row per variant:
+
+    category_slug, category_name, product_title, product_description,
+    sku, color, size, price, stock
+
+Import upserts categories on slug and variants on sku; a new sku is
+attached to the product with the same category and title, which is
+created if needed. Rows are processed in chunks, each in one transaction
+with a fixed number of queries, so memory stays flat however long the
+file is. Unchanged rows cause no writes.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import catalog_cache
+from .cart import invalidate_cart_summary
+from .models import Category, Product, ProductVariant, CartItem
+
+FIELDS = [
+    'category_slug', 'category_name', 'product_title', 'product_description',
+    'sku', 'color', 'size', 'price', 'stock',
+]
+FORMATS = ('csv', 'jsonl')
+MAX_REPORTED_ERRORS = 100
+
+
+def export_rows(chunk_size=5000):
+    """Yield every variant as a row dict, paging by id."""
+    last_id = 0
+    while True:
+        chunk = list(
+            ProductVariant.objects.filter(id__gt=last_id).order_by('id').values_list(
+                'id', 'product__category__slug', 'product__category__name', 'product__title',
+                'product__description', 'sku', 'color', 'size', 'price', 'stock',
+            )[:chunk_size]
+        )
+        if not chunk:
+            return
+        for row in chunk:
+            yield dict(zip(FIELDS, row[1:]))
+        last_id = chunk[-1][0]
+
+
+def iter_csv(rows, lines_per_chunk=1000):
+    """Encode rows as CSV text, yielding a chunk every `lines_per_chunk` rows."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    for n, row in enumerate(rows, 1):
+        writer.writerow({k: '' if v is None else v for k, v in row.items()})
+        if n % lines_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, default=str) + '\n'
+
+
+def encode(rows, fmt):
+    return iter_csv(rows) if fmt == 'csv' else iter_jsonl(rows)
+
+
+def read_rows(stream, fmt):
+    """Yield (line_number, row dict) from a text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for n, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield n, row if isinstance(row, dict) else {'__invalid__': True}
+
+
+def format_for(name, default='csv'):
+    suffix = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return {'csv': 'csv', 'jsonl': 'jsonl', 'ndjson': 'jsonl'}.get(suffix, default)
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    categories_created: int = 0
+    products_created: int = 0
+    products_updated: int = 0
+    variants_created: int = 0
+    variants_updated: int = 0
+    unchanged: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+# Feed column -> model field, for length and range checks
+CHAR_FIELDS = {
+    'category_slug': Category._meta.get_field('slug'),
+    'category_name': Category._meta.get_field('name'),
+    'product_title': Product._meta.get_field('title'),
+    'sku': ProductVariant._meta.get_field('sku'),
+    'color': ProductVariant._meta.get_field('color'),
+    'size': ProductVariant._meta.get_field('size'),
+}
+PRICE_FIELD = ProductVariant._meta.get_field('price')
+CENT = Decimal(1).scaleb(-PRICE_FIELD.decimal_places)
+MAX_PRICE = Decimal(10) ** (PRICE_FIELD.max_digits - PRICE_FIELD.decimal_places)
+
+
+def _text(row, key):
+    return str(row.get(key) or '').strip()
+
+
+def _clean_price(value):
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValueError("price must be a number")
+    if not price.is_finite():
+        raise ValueError("price must be a number")
+    if price < 0:
+        raise ValueError("price must not be negative")
+    if price >= MAX_PRICE:
+        raise ValueError(f"price must be below {MAX_PRICE}")
+    return price.quantize(CENT)
+
+
+def _clean(row):
+    if row.get('__invalid__'):
+        raise ValueError("not a JSON object")
+    cleaned = {key: _text(row, key) for key in CHAR_FIELDS}
+    for key in ('category_slug', 'product_title', 'sku'):
+        if not cleaned[key]:
+            raise ValueError(f"{key} is required")
+    for key, model_field in CHAR_FIELDS.items():
+        if len(cleaned[key]) > model_field.max_length:
+            raise ValueError(f"{key} is longer than {model_field.max_length} characters")
+    cleaned['category_name'] = cleaned['category_name'] or cleaned['category_slug']
+    cleaned['product_description'] = str(row.get('product_description') or '')
+    cleaned['color'] = cleaned['color'] or None
+    cleaned['size'] = cleaned['size'] or None
+    cleaned['price'] = _clean_price(_text(row, 'price'))
+    try:
+        cleaned['stock'] = int(_text(row, 'stock') or 0)
+    except ValueError:
+        raise ValueError("stock must be a whole number")
+    if cleaned['stock'] < 0:
+        raise ValueError("stock must not be negative")
+    return cleaned
+
+
+class CatalogImporter:
+    def __init__(self, batch_size=2000):
+        self.batch_size = batch_size
+        self.result = ImportResult()
+        # slug -> (id, name); categories are few, so this is kept for the run
+        self.categories = {}
+
+    def run(self, numbered_rows):
+        batch = []
+        for line, row in numbered_rows:
+            self.result.rows += 1
+            try:
+                batch.append(_clean(row))
+            except ValueError as exc:
+                self.result.error(line, str(exc))
+                continue
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return self.result
+
+    def import_batch(self, rows):
+        # Last row wins for a sku repeated within the batch
+        rows = list({row['sku']: row for row in rows}.values())
+        now = timezone.now()
+        with transaction.atomic():
+            category_ids = self.upsert_categories(rows)
+            existing = {}
+            for vid, sku, product_id, color, size, price, stock in (
+                ProductVariant.objects.filter(sku__in=[row['sku'] for row in rows]).order_by('-id')
+                .values_list('id', 'sku', 'product_id', 'color', 'size', 'price', 'stock')
+            ):
+                # Skus are not unique in the table; the oldest variant wins
+                existing[sku] = (vid, product_id, color, size, price, stock)
+            product_ids = self.upsert_products(rows, category_ids, existing, now)
+
+            created, updated = [], []
+            for row in rows:
+                product_id = product_ids[row['sku']]
+                values = (product_id, row['color'], row['size'], row['price'], row['stock'])
+                current = existing.get(row['sku'])
+                if current is None:
+                    created.append(ProductVariant(sku=row['sku'], product_id=product_id, color=row['color'],
+                                                  size=row['size'], price=row['price'], stock=row['stock']))
+                elif current[1:] != values:
+                    updated.append(ProductVariant(id=current[0], sku=row['sku'], product_id=product_id,
+                                                  color=row['color'], size=row['size'], price=row['price'],
+                                                  stock=row['stock'], updated_at=now))
+                else:
+                    self.result.unchanged += 1
+            ProductVariant.objects.bulk_create(created)
+            ProductVariant.objects.bulk_update(updated, ['product', 'color', 'size', 'price', 'stock', 'updated_at'])
+            self.result.variants_created += len(created)
+            self.result.variants_updated += len(updated)
+
+            touched = {v.product_id for v in created + updated} | {existing[v.sku][1] for v in updated}
+            catalog_cache.invalidate_many('product', touched)
+            # Cart summaries price lines from the live variant; new variants are in no cart yet
+            if updated:
+                user_ids = CartItem.objects.filter(variant_id__in=[v.id for v in updated]).values_list(
+                    'user_id', flat=True
+                ).distinct()
+                invalidate_cart_summary(*user_ids)
+
+    def upsert_categories(self, rows):
+        wanted = {row['category_slug']: row['category_name'] for row in rows}
+        missing = [slug for slug in wanted if slug not in self.categories]
+        if missing:
+            for pk, slug, name in Category.objects.filter(slug__in=missing).values_list('id', 'slug', 'name'):
+                self.categories[slug] = (pk, name)
+            new = [Category(slug=slug, name=wanted[slug]) for slug in missing if slug not in self.categories]
+            if new:
+                Category.objects.bulk_create(new, ignore_conflicts=True)
+                for pk, slug, name in Category.objects.filter(slug__in=[c.slug for c in new]).values_list(
+                    'id', 'slug', 'name'
+                ):
+                    self.categories[slug] = (pk, name)
+                self.result.categories_created += len(new)
+
+        renamed = [
+            Category(id=self.categories[slug][0], slug=slug, name=name)
+            for slug, name in wanted.items() if self.categories[slug][1] != name
+        ]
+        if renamed:
+            Category.objects.bulk_update(renamed, ['name'])
+            for category in renamed:
+                self.categories[category.slug] = (category.id, category.name)
+            catalog_cache.invalidate_many('category', [c.id for c in renamed])
+        return {slug: pk for slug, (pk, _) in self.categories.items() if slug in wanted}
+
+    def upsert_products(self, rows, category_ids, existing, now):
+        """Return sku -> product id, creating and updating products as needed."""
+        def key(row):
+            return category_ids[row['category_slug']], row['product_title']
+
+        # A known sku keeps its product; a new one joins the product with the same category and title
+        unmatched = [row for row in rows if row['sku'] not in existing]
+        by_key = {}
+        if unmatched:
+            for pk, category_id, title in Product.objects.filter(
+                category_id__in={key(row)[0] for row in unmatched}, title__in={row['product_title'] for row in unmatched}
+            ).order_by('-id').values_list('id', 'category_id', 'title'):
+                by_key[(category_id, title)] = pk
+
+        new = {}
+        for row in unmatched:
+            if key(row) not in by_key:
+                new[key(row)] = Product(category_id=key(row)[0], title=row['product_title'],
+                                        description=row['product_description'])
+        Product.objects.bulk_create(new.values())
+        by_key.update((k, product.id) for k, product in new.items())
+        self.result.products_created += len(new)
+
+        product_ids = {
+            row['sku']: existing[row['sku']][1] if row['sku'] in existing else by_key[key(row)] for row in rows
+        }
+        created = {product.id for product in new.values()}
+        wanted = {product_ids[row['sku']]: row for row in rows if product_ids[row['sku']] not in created}
+        updated = []
+        for pk, category_id, title, description in Product.objects.filter(id__in=wanted).values_list(
+            'id', 'category_id', 'title', 'description'
+        ):
+            row = wanted[pk]
+            values = (*key(row), row['product_description'])
+            if (category_id, title, description) != values:
+                updated.append(Product(id=pk, category_id=values[0], title=values[1], description=values[2],
+                                       updated_at=now))
+        Product.objects.bulk_update(updated, ['category', 'title', 'description', 'updated_at'])
+        self.result.products_updated += len(updated)
+        catalog_cache.invalidate_many('product', [product.id for product in updated])
+        return product_ids
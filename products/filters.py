@@ -0,0 +1,53 @@
+# products/filters.py
+from django.db.models import Count, F
+from rest_framework.filters import BaseFilterBackend
+from .models import Category, ProductVariant
+from .serializers import ProductFilterSerializer
+
+def filter_products(queryset, category=None, color=None, size=None, min_price=None, max_price=None, in_stock=False):
+    """
+    Variant filters must all hold for the same variant, so they are applied
+    as one subquery rather than joins (which would also need DISTINCT).
+    """
+    if category:
+        queryset = queryset.filter(category__slug=category)
+
+    variant_filters = {}
+    if color:
+        variant_filters['color__iexact'] = color
+    if size:
+        variant_filters['size__iexact'] = size
+    if min_price is not None:
+        variant_filters['price__gte'] = min_price
+    if max_price is not None:
+        variant_filters['price__lte'] = max_price
+    if in_stock:
+        variant_filters['stock__gt'] = 0
+    if variant_filters:
+        queryset = queryset.filter(
+            id__in=ProductVariant.objects.filter(**variant_filters).values('product_id')
+        )
+    return queryset
+
+def product_facets(queryset):
+    """Number of matching products per color, size and category, one grouped query each."""
+    product_ids = queryset.order_by().values('pk')
+    variants = ProductVariant.objects.filter(product__in=product_ids).order_by()
+
+    def counts(values):
+        return {row['value']: row['count'] for row in values if row['value'] not in (None, '')}
+
+    return {
+        'color': counts(variants.values(value=F('color')).annotate(count=Count('product', distinct=True))),
+        'size': counts(variants.values(value=F('size')).annotate(count=Count('product', distinct=True))),
+        'category': counts(
+            Category.objects.filter(products__in=product_ids).order_by()
+            .values(value=F('slug')).annotate(count=Count('products', distinct=True))
+        ),
+    }
+
+class ProductFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        params = ProductFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return filter_products(queryset, **params.validated_data)
@@ -0,0 +1,50 @@
+# products/inventory.py
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .cache import catalog_cache
+from .models import ProductVariant
+
+class InsufficientStock(Exception):
+    def __init__(self, variant_id, requested):
+        self.variant_id = variant_id
+        self.requested = requested
+        super().__init__(f"Insufficient stock for variant {variant_id} (requested {requested}).")
+
+def _merge_lines(lines):
+    quantities = {}
+    for variant_id, quantity in lines:
+        quantities[variant_id] = quantities.get(variant_id, 0) + quantity
+    return sorted(quantities.items())
+
+def _invalidate_products(variant_ids):
+    # Queryset updates skip post_save, so drop the cached product payloads
+    # (which embed stock) here
+    product_ids = ProductVariant.objects.filter(pk__in=variant_ids).values_list('product_id', flat=True)
+    for product_id in set(product_ids):
+        catalog_cache.invalidate('product', product_id)
+
+def reserve_stock(lines):
+    """
+    Take stock for (variant_id, quantity) pairs, all or nothing.
+    Each line is a conditional UPDATE so stock can never go negative, and
+    rows are touched in variant-id order so concurrent checkouts lock them
+    in the same order and cannot deadlock.
+    """
+    lines = _merge_lines(lines)
+    with transaction.atomic():
+        for variant_id, quantity in lines:
+            updated = ProductVariant.objects.filter(
+                pk=variant_id, stock__gte=quantity
+            ).update(stock=F('stock') - quantity, updated_at=timezone.now())
+            if not updated:
+                raise InsufficientStock(variant_id, quantity)
+        _invalidate_products([variant_id for variant_id, _ in lines])
+
+def release_stock(lines):
+    """Give back stock previously taken by reserve_stock."""
+    lines = _merge_lines(lines)
+    with transaction.atomic():
+        for variant_id, quantity in lines:
+            ProductVariant.objects.filter(pk=variant_id).update(stock=F('stock') + quantity, updated_at=timezone.now())
+        _invalidate_products([variant_id for variant_id, _ in lines])
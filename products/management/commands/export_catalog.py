@@ -0,0 +1,29 @@
+# products/management/commands/export_catalog.py
+from django.core.management.base import BaseCommand, CommandError
+
+from products.catalog_io import FORMATS, encode, export_rows, format_for
+
+
+class Command(BaseCommand):
+    help = "Stream the catalog (one row per variant) to CSV or JSONL, reading variants in id-ordered chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="File to write, or - for stdout (default).")
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension, else csv.")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or format_for(path)
+        chunks = encode(export_rows(options['chunk_size']), fmt)
+        if path == '-':
+            for text in chunks:
+                self.stdout.write(text, ending='')
+            return
+        try:
+            out = open(path, 'w', newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f"Cannot write {path}: {exc}")
+        with out:
+            for text in chunks:
+                out.write(text)
@@ -0,0 +1,38 @@
+# products/management/commands/import_catalog.py
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.catalog_io import FORMATS, CatalogImporter, format_for, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a CSV or JSONL catalog feed (one row per variant) into the database, "
+        "upserting categories on slug and variants on sku in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to read, or - for stdin.")
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension, else csv.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or format_for(path)
+        started = time.perf_counter()
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        with stream:
+            result = CatalogImporter(options['batch_size']).run(read_rows(stream, fmt))
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        summary = result.as_dict()
+        summary.pop('errors')
+        summary['seconds'] = round(time.perf_counter() - started, 1)
+        self.stdout.write(json.dumps(summary))
@@ -0,0 +1,16 @@
+# products/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from products.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Recreate the product search index (and its sync triggers on SQLite) and reindex every product."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic(), connection.cursor() as cursor:
+            backend.install(cursor)
+            backend.rebuild(cursor)
+        self.stdout.write(f"Rebuilt product search index ({type(backend).__name__}).")
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# Frozen copy of the DDL in products/search.py as of this migration; later
+# changes to the search backends need a new migration, not an edit here.
+INSTALL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS products_product_fts USING fts5("
+        "title, description, content='products_product', content_rowid='id', prefix='2 3')",
+        "CREATE TRIGGER IF NOT EXISTS products_product_fts_ai AFTER INSERT ON products_product BEGIN "
+        "INSERT INTO products_product_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS products_product_fts_ad AFTER DELETE ON products_product BEGIN "
+        "INSERT INTO products_product_fts(products_product_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS products_product_fts_au AFTER UPDATE ON products_product BEGIN "
+        "INSERT INTO products_product_fts(products_product_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO products_product_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "INSERT INTO products_product_fts(products_product_fts) VALUES ('rebuild')",
+    ],
+    'postgresql': [
+        "ALTER TABLE products_product ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+        "CREATE INDEX IF NOT EXISTS products_product_search_gin "
+        "ON products_product USING gin (search_vector)",
+    ],
+}
+
+UNINSTALL = {
+    'sqlite': [
+        "DROP TRIGGER IF EXISTS products_product_fts_ai",
+        "DROP TRIGGER IF EXISTS products_product_fts_ad",
+        "DROP TRIGGER IF EXISTS products_product_fts_au",
+        "DROP TABLE IF EXISTS products_product_fts",
+    ],
+    'postgresql': [
+        "DROP INDEX IF EXISTS products_product_search_gin",
+        "ALTER TABLE products_product DROP COLUMN IF EXISTS search_vector",
+    ],
+}
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        # Other databases use the unindexed fallback and need nothing
+        with schema_editor.connection.cursor() as cursor:
+            for sql in statements.get(schema_editor.connection.vendor, []):
+                cursor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_productvariant_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_for_vendor(INSTALL), run_for_vendor(UNINSTALL)),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['user', 'added_at', 'id'], name='cartitem_user_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['created_at', 'id'], name='product_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productvariant',
+            index=models.Index(fields=['product', 'price'], name='variant_product_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productvariant',
+            index=models.Index(fields=['price'], name='variant_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wishlistitem',
+            index=models.Index(fields=['user', 'added_at', 'id'], name='wishlist_user_added_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productvariant',
+            index=models.Index(fields=['sku'], name='variant_sku_idx'),
+        ),
+    ]
@@ -10,11 +10,26 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class ProductQuerySet(models.QuerySet):
+    def for_catalog(self):
+        # Join the category and batch-load variants so that serializing a
+        # page of products costs a fixed number of queries.
+        return self.select_related('category').prefetch_related('variants')
+
 class Product(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Catalog listing, paged by (-created_at, -id)
+            models.Index(fields=['created_at', 'id'], name='product_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -26,6 +41,16 @@ class ProductVariant(models.Model):
     size = models.CharField(max_length=50, blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'price'], name='variant_product_price_idx'),
+            # Price-range filters and search
+            models.Index(fields=['price'], name='variant_price_idx'),
+            # Catalog import upserts on sku
+            models.Index(fields=['sku'], name='variant_sku_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product.title} - {self.color or ''} - {self.size or ''}"
@@ -38,6 +63,9 @@ class CartItem(models.Model):
 
     class Meta:
         unique_together = ('user','variant')
+        indexes = [
+            models.Index(fields=['user', 'added_at', 'id'], name='cartitem_user_added_idx'),
+        ]
 
     def __str__(self):
         return f"CartItem({self.user}, {self.variant}, qty={self.quantity})"
@@ -49,6 +77,9 @@ class WishlistItem(models.Model):
 
     class Meta:
         unique_together = ('user','product')
+        indexes = [
+            models.Index(fields=['user', 'added_at', 'id'], name='wishlist_user_added_idx'),
+        ]
 
     def __str__(self):
         return f"Wishlist({self.user}, {self.product})"
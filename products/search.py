@@ -0,0 +1,128 @@
+# products/search.py
+import re
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from .filters import filter_products
+from .models import Product
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TERMS = 10
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())[:MAX_TERMS]
+
+class SqliteSearchBackend:
+    """
+    FTS5 external-content table over products_product, kept in sync by
+    triggers. SQLite drops triggers when Django rebuilds the table during
+    a migration; run `rebuild_search_index` after such migrations.
+    """
+    table = 'products_product_fts'
+
+    def install(self, cursor):
+        t = self.table
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {t} USING fts5("
+            f"title, description, content='products_product', content_rowid='id', prefix='2 3')"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {t}_ai AFTER INSERT ON products_product BEGIN "
+            f"INSERT INTO {t}(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {t}_ad AFTER DELETE ON products_product BEGIN "
+            f"INSERT INTO {t}({t}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {t}_au AFTER UPDATE ON products_product BEGIN "
+            f"INSERT INTO {t}({t}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+            f"INSERT INTO {t}(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        self.rebuild(cursor)
+
+    def uninstall(self, cursor):
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {self.table}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def rebuild(self, cursor):
+        cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")
+
+    def search(self, queryset, terms):
+        t = self.table
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # bm25 is lower-is-better; negate it so every backend sorts by -search_rank.
+        # Title matches weigh ten times as much as description matches.
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {t} WHERE {t} MATCH %s", (match,))
+        ).annotate(search_rank=RawSQL(
+            f"SELECT -bm25({t}, 10.0, 1.0) FROM {t} WHERE {t} MATCH %s AND rowid = products_product.id",
+            (match,), output_field=FloatField()
+        ))
+
+class PostgresSearchBackend:
+    """Weighted tsvector stored in a generated column with a GIN index."""
+
+    def install(self, cursor):
+        cursor.execute(
+            "ALTER TABLE products_product ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS products_product_search_gin "
+            "ON products_product USING gin (search_vector)"
+        )
+
+    def uninstall(self, cursor):
+        cursor.execute("DROP INDEX IF EXISTS products_product_search_gin")
+        cursor.execute("ALTER TABLE products_product DROP COLUMN IF EXISTS search_vector")
+
+    def rebuild(self, cursor):
+        # Generated columns are always current
+        pass
+
+    def search(self, queryset, terms):
+        tsquery = ' & '.join(f"{term}:*" for term in terms)
+        return queryset.filter(RawSQL(
+            "products_product.search_vector @@ to_tsquery('english', %s)",
+            (tsquery,), output_field=BooleanField()
+        )).annotate(search_rank=RawSQL(
+            "ts_rank(products_product.search_vector, to_tsquery('english', %s))",
+            (tsquery,), output_field=FloatField()
+        ))
+
+class BasicSearchBackend:
+    """Unindexed fallback for other databases."""
+
+    def install(self, cursor):
+        pass
+
+    def uninstall(self, cursor):
+        pass
+
+    def rebuild(self, cursor):
+        pass
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+def get_search_backend(conn=None):
+    return BACKENDS.get((conn or connection).vendor, BasicSearchBackend)()
+
+def search_products(q='', **filters):
+    """Ranked product search, narrowed by the listing filters."""
+    queryset = filter_products(Product.objects.for_catalog(), **filters)
+    terms = tokenize(q)
+    if not terms:
+        return queryset.order_by('-created_at', '-id')
+    return get_search_backend().search(queryset, terms).order_by('-search_rank', '-id')
@@ -31,3 +31,38 @@ class WishlistSerializer(serializers.ModelSerializer):
     class Meta:
         model = WishlistItem
         fields = ('id','product','product_id')
+
+class CartOperationSerializer(serializers.Serializer):
+    OP_CHOICES = ('add', 'set', 'remove')
+    variant_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=0, default=1)
+    op = serializers.ChoiceField(choices=OP_CHOICES, default='add')
+
+    def validate(self, attrs):
+        if attrs['op'] == 'add' and attrs['quantity'] < 1:
+            raise serializers.ValidationError({"quantity": "Must be at least 1 when adding."})
+        return attrs
+
+class CartBulkSerializer(serializers.Serializer):
+    items = CartOperationSerializer(many=True, allow_empty=False, max_length=200)
+
+    def validate_items(self, items):
+        # One IN query for every variant referenced by the batch
+        ids = {item['variant_id'] for item in items}
+        found = set(ProductVariant.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        missing = sorted(ids - found)
+        if missing:
+            raise serializers.ValidationError(f"Unknown variant ids: {missing}")
+        return items
+
+class ProductFilterSerializer(serializers.Serializer):
+    category = serializers.SlugField(required=False)
+    color = serializers.CharField(required=False)
+    size = serializers.CharField(required=False)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    in_stock = serializers.BooleanField(required=False)
+
+class ProductSearchSerializer(ProductFilterSerializer):
+    q = serializers.CharField(required=False, allow_blank=True, default='')
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
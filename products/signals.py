@@ -0,0 +1,29 @@
+# products/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .cache import catalog_cache
+from .cart import invalidate_cart_summary
+from .models import Category, Product, ProductVariant, CartItem
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    catalog_cache.invalidate('category', instance.pk)
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    catalog_cache.invalidate('product', instance.pk)
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+def invalidate_variant_product(sender, instance, **kwargs):
+    # Variants are embedded in the product payload
+    catalog_cache.invalidate('product', instance.product_id)
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+def invalidate_variant_carts(sender, instance, **kwargs):
+    # Cart summaries price lines from the live variant
+    user_ids = CartItem.objects.filter(variant_id=instance.pk).values_list('user_id', flat=True)
+    invalidate_cart_summary(*user_ids)
+
+@receiver([post_save, post_delete], sender=CartItem)
+def invalidate_cart(sender, instance, **kwargs):
+    invalidate_cart_summary(instance.user_id)
@@ -1,3 +1,545 @@
-from django.test import TestCase
+import io
+import json
+import threading
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import catalog_cache
+from .cart import cart_summary_key, invalidate_cart_summary
+from .catalog_io import CatalogImporter, read_rows
+from .inventory import reserve_stock, InsufficientStock
+from .models import Category, Product, ProductVariant, CartItem
+
+User = get_user_model()
+
+
+def make_catalog(category, products, variants_per_product=3):
+    for i in range(products):
+        product = Product.objects.create(category=category, title=f"Product {i}")
+        ProductVariant.objects.bulk_create([
+            ProductVariant(product=product, sku=f"SKU-{product.id}-{j}", price=Decimal('10.00') + j, stock=5)
+            for j in range(variants_per_product)
+        ])
+
+
+class ProductQueryCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='shopper', email='shopper@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name='Shirts', slug='shirts')
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/products/products/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        make_catalog(self.category, 2)
+        small = self.count_list_queries()
+        make_catalog(self.category, 20)
+        large = self.count_list_queries()
+        self.assertEqual(small, large)
+
+    def test_retrieve_prefetches_variants(self):
+        make_catalog(self.category, 1, variants_per_product=10)
+        product = Product.objects.get()
+        # product + variants
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/products/products/{product.id}/')
+        self.assertEqual(len(response.data['variants']), 10)
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cached', email='cached@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        make_catalog(Category.objects.create(name='Hats', slug='hats'), 1, variants_per_product=2)
+        self.product = Product.objects.get()
+        self.url = f'/api/products/products/{self.product.id}/'
+
+    def test_second_read_is_served_from_cache(self):
+        before = catalog_cache.stats()
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['variants']), 2)
+        after = catalog_cache.stats()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    def test_variant_and_product_writes_invalidate(self):
+        self.client.get(self.url)
+        variant = self.product.variants.first()
+        variant.price = Decimal('42.00')
+        variant.save()
+        response = self.client.get(self.url)
+        self.assertIn('42.00', [v['price'] for v in response.data['variants']])
+
+        self.product.title = 'Renamed'
+        self.product.save()
+        self.assertEqual(self.client.get(self.url).data['title'], 'Renamed')
+
+        self.product.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ProductConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='poller', email='poller@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        make_catalog(Category.objects.create(name='Socks', slug='socks'), 3, variants_per_product=2)
+
+    def test_unchanged_list_returns_304(self):
+        first = self.client.get('/api/products/products/')
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('Last-Modified', first)
+
+        second = self.client.get('/api/products/products/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+        ProductVariant.objects.first().save()
+        third = self.client.get('/api/products/products/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third['ETag'], first['ETag'])
+
+    def test_delete_changes_etag_without_scanning(self):
+        first = self.client.get('/api/products/products/')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/products/products/', HTTP_IF_NONE_MATCH=first['ETag'])
+        # The version comes from the cache; only authentication may query
+        self.assertFalse([q for q in ctx.captured_queries if 'products_' in q['sql']])
+
+        ProductVariant.objects.first().delete()
+        response = self.client.get(
+            '/api/products/products/', HTTP_IF_NONE_MATCH=first['ETag'],
+            HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT',
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='seeker', email='seeker@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        shoes = Category.objects.create(name='Shoes', slug='shoes')
+        shirts = Category.objects.create(name='Shirts', slug='shirts')
+        self.runner = Product.objects.create(category=shoes, title='Trail running shoe', description='Grippy sole')
+        self.tee = Product.objects.create(category=shirts, title='Cotton tee', description='Good for running errands')
+        self.boot = Product.objects.create(category=shoes, title='Leather boot', description='Waterproof')
+        ProductVariant.objects.create(product=self.runner, color='Red', size='42', price=Decimal('80.00'))
+        ProductVariant.objects.create(product=self.runner, color='Blue', size='44', price=Decimal('85.00'))
+        ProductVariant.objects.create(product=self.tee, color='Red', size='M', price=Decimal('15.00'))
+        ProductVariant.objects.create(product=self.boot, color='Brown', size='42', price=Decimal('120.00'))
+
+    def search(self, **params):
+        response = self.client.get('/api/products/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_prefix_match_ranks_title_hits_first(self):
+        self.assertEqual(self.search(q='runn'), [self.runner.id, self.tee.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.boot.title = 'Leather running boot'
+        self.boot.save()
+        self.assertIn(self.boot.id, self.search(q='running'))
+        self.runner.delete()
+        self.assertNotIn(self.runner.id, self.search(q='running'))
+
+    def test_filters_apply_to_a_single_variant(self):
+        self.assertEqual(self.search(q='running', category='shoes'), [self.runner.id])
+        self.assertEqual(self.search(color='red', size='M'), [self.tee.id])
+        # Red exists only at 80.00 for the runner, so a red variant over 82 matches nothing
+        self.assertEqual(self.search(q='shoe', color='red', min_price='82'), [])
+        self.assertEqual(self.search(min_price='100', max_price='150'), [self.boot.id])
+
+    def test_rejects_bad_limit(self):
+        response = self.client.get('/api/products/search/', {'q': 'shoe', 'limit': 500})
+        self.assertEqual(response.status_code, 400)
+
+
+class ProductFacetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='browser', email='browser@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        shoes = Category.objects.create(name='Shoes', slug='shoes')
+        shirts = Category.objects.create(name='Shirts', slug='shirts')
+        sneaker = Product.objects.create(category=shoes, title='Sneaker')
+        tee = Product.objects.create(category=shirts, title='Tee')
+        polo = Product.objects.create(category=shirts, title='Polo')
+        ProductVariant.objects.create(product=sneaker, color='Red', size='42', price=Decimal('60.00'), stock=0)
+        ProductVariant.objects.create(product=sneaker, color='White', size='43', price=Decimal('60.00'), stock=4)
+        ProductVariant.objects.create(product=tee, color='Red', size='M', price=Decimal('15.00'), stock=9)
+        ProductVariant.objects.create(product=tee, color='Red', size='L', price=Decimal('15.00'), stock=9)
+        ProductVariant.objects.create(product=polo, color='Navy', size='M', price=Decimal('30.00'), stock=2)
+
+    def test_facets_count_products_not_variants(self):
+        response = self.client.get('/api/products/products/')
+        self.assertEqual(len(response.data['results']), 3)
+        facets = response.data['facets']
+        self.assertEqual(facets['color'], {'Red': 2, 'White': 1, 'Navy': 1})
+        self.assertEqual(facets['size'], {'42': 1, '43': 1, 'M': 2, 'L': 1})
+        self.assertEqual(facets['category'], {'shoes': 1, 'shirts': 2})
+
+    def test_filters_narrow_results_and_facets(self):
+        response = self.client.get('/api/products/products/', {'color': 'red', 'in_stock': 'true'})
+        self.assertEqual([p['title'] for p in response.data['results']], ['Tee'])
+        self.assertEqual(response.data['facets']['category'], {'shirts': 1})
+
+        response = self.client.get('/api/products/products/', {'category': 'shirts', 'max_price': '20'})
+        self.assertEqual([p['title'] for p in response.data['results']], ['Tee'])
+
+    def test_listing_with_facets_has_fixed_query_count(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/products/products/', {'size': 'M'})
+        make_catalog(Category.objects.get(slug='shirts'), 10)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get('/api/products/products/', {'size': 'M'})
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_invalid_filter_is_rejected(self):
+        response = self.client.get('/api/products/products/', {'min_price': 'cheap'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CartSummaryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='carter', email='carter@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        product = Product.objects.create(category=Category.objects.create(name='Mugs', slug='mugs'), title='Mug')
+        self.cheap = ProductVariant.objects.create(product=product, price=Decimal('4.50'), stock=10)
+        self.dear = ProductVariant.objects.create(product=product, price=Decimal('19.99'), stock=10)
+
+    def test_empty_cart(self):
+        response = self.client.get('/api/products/cart/summary/')
+        self.assertEqual(response.data, {'line_count': 0, 'item_count': 0, 'subtotal': '0.00', 'lines': []})
+
+    def test_totals_in_one_query_and_invalidation(self):
+        CartItem.objects.create(user=self.user, variant=self.cheap, quantity=3)
+        CartItem.objects.create(user=self.user, variant=self.dear, quantity=1)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/cart/summary/')
+        self.assertEqual(response.data['item_count'], 4)
+        self.assertEqual(response.data['subtotal'], '33.49')
+        self.assertEqual(
+            {line['variant_id']: line['line_total'] for line in response.data['lines']},
+            {self.cheap.id: '13.50', self.dear.id: '19.99'},
+        )
+        with self.assertNumQueries(0):
+            self.client.get('/api/products/cart/summary/')
+
+        self.dear.price = Decimal('20.00')
+        self.dear.save()
+        self.assertEqual(self.client.get('/api/products/cart/summary/').data['subtotal'], '33.50')
+
+        CartItem.objects.filter(variant=self.cheap).delete()
+        self.assertEqual(self.client.get('/api/products/cart/summary/').data['subtotal'], '20.00')
+
+    def test_summary_is_dropped_again_on_commit(self):
+        key = cart_summary_key(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_cart_summary(self.user.id)
+            # A concurrent reader re-caches the pre-commit summary
+            cache.set(key, {'subtotal': 'stale'})
+        self.assertIsNone(cache.get(key))
+
+
+class CartBulkTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='syncer', email='syncer@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        product = Product.objects.create(category=Category.objects.create(name='Pens', slug='pens'), title='Pen')
+        self.variants = ProductVariant.objects.bulk_create([
+            ProductVariant(product=product, sku=f'PEN-{i}', price=Decimal('2.00'), stock=100) for i in range(30)
+        ])
+        CartItem.objects.create(user=self.user, variant=self.variants[0], quantity=5)
+        CartItem.objects.create(user=self.user, variant=self.variants[1], quantity=5)
+
+    def quantities(self):
+        return dict(CartItem.objects.filter(user=self.user).values_list('variant_id', 'quantity'))
+
+    def test_guest_cart_sync_uses_fixed_queries(self):
+        items = [{'variant_id': v.id, 'quantity': 2} for v in self.variants]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/products/cart/bulk/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(ctx.captured_queries), 10)
+        quantities = self.quantities()
+        self.assertEqual(len(quantities), 30)
+        self.assertEqual(quantities[self.variants[0].id], 7)
+        self.assertEqual(quantities[self.variants[29].id], 2)
+        self.assertEqual(response.data['item_count'], 70)
+
+    def test_set_remove_and_add_fold_in_order(self):
+        v0, v1, v2 = (v.id for v in self.variants[:3])
+        response = self.client.post('/api/products/cart/bulk/', {'items': [
+            {'variant_id': v0, 'op': 'set', 'quantity': 1},
+            {'variant_id': v0, 'quantity': 2},
+            {'variant_id': v1, 'op': 'remove'},
+            {'variant_id': v2, 'quantity': 4},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities(), {v0: 3, v2: 4})
+
+    def test_unknown_variant_rejects_whole_batch(self):
+        response = self.client.post('/api/products/cart/bulk/', {'items': [
+            {'variant_id': self.variants[2].id},
+            {'variant_id': 999999},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.quantities()), 2)
+
+
+class CartAddConcurrencyTests(TransactionTestCase):
+    def test_concurrent_adds_are_not_lost(self):
+        user = User.objects.create_user(username='twotabs', email='twotabs@example.com', password='pass12345')
+        product = Product.objects.create(category=Category.objects.create(name='Ink', slug='ink'), title='Ink')
+        variant = ProductVariant.objects.create(product=product, price=Decimal('3.00'), stock=100)
+
+        threads, adds_per_thread = 8, 5
+        errors = []
+
+        def shopper(quantity):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                for _ in range(adds_per_thread):
+                    response = client.post('/api/products/cart/add/', {'variant_id': variant.id, 'quantity': quantity})
+                    if response.status_code != 200:
+                        errors.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=shopper, args=(i + 1,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        item = CartItem.objects.get(user=user, variant=variant)
+        self.assertEqual(item.quantity, adds_per_thread * sum(range(1, threads + 1)))
+
+
+class AsyncReadViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='asyncer', email='asyncer@example.com', password='pass12345')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        make_catalog(Category.objects.create(name='Lamps', slug='lamps'), 5, variants_per_product=2)
+
+    def test_requires_valid_token(self):
+        self.assertEqual(self.client.get('/api/products/async/products/').status_code, 401)
+        response = self.client.get('/api/products/async/products/', HTTP_AUTHORIZATION='Bearer nope')
+        self.assertEqual(response.status_code, 401)
+
+    def test_product_list_pages_by_key(self):
+        seen, url = [], '/api/products/async/products/?page_size=2'
+        while url:
+            response = self.client.get(url, **self.auth)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertEqual(len(body['results'][0]['variants']), 2)
+            seen.extend(item['id'] for item in body['results'])
+            url = body['next']
+        self.assertEqual(seen, list(Product.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_product_detail_and_missing(self):
+        product = Product.objects.first()
+        response = self.client.get(f'/api/products/async/products/{product.id}/', **self.auth)
+        self.assertEqual(response.json()['title'], product.title)
+        self.assertEqual(self.client.get('/api/products/async/products/999999/', **self.auth).status_code, 404)
+
+    def test_category_and_cart_lists(self):
+        CartItem.objects.create(user=self.user, variant=ProductVariant.objects.first(), quantity=2)
+        self.assertEqual(len(self.client.get('/api/products/async/categories/', **self.auth).json()['results']), 1)
+        cart = self.client.get('/api/products/async/cart/', **self.auth).json()['results']
+        self.assertEqual(cart[0]['quantity'], 2)
+        self.assertEqual(self.client.get('/api/products/async/cart/?before=x', **self.auth).status_code, 400)
+
+
+class ProductPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', email='pager@example.com', password='pass12345')
+        self.client.force_authenticate(self.user)
+        make_catalog(Category.objects.create(name='Shoes', slug='shoes'), 12, variants_per_product=1)
+
+    def test_cursor_pages_cover_catalog_once(self):
+        seen = []
+        url = '/api/products/products/?page_size=5'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 5)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(sorted(seen), sorted(Product.objects.values_list('id', flat=True)))
+
+
+class StockReservationConcurrencyTests(TransactionTestCase):
+    def test_concurrent_reservations_never_oversell(self):
+        category = Category.objects.create(name='Flash', slug='flash')
+        product = Product.objects.create(category=category, title='Limited drop')
+        variant = ProductVariant.objects.create(product=product, sku='DROP-1', price=Decimal('99.00'), stock=25)
+
+        attempts_per_thread, threads = 5, 10
+        reserved, rejected = [], []
+        lock = threading.Lock()
+
+        def buyer():
+            try:
+                for _ in range(attempts_per_thread):
+                    try:
+                        reserve_stock([(variant.id, 1)])
+                        outcome = reserved
+                    except InsufficientStock:
+                        outcome = rejected
+                    with lock:
+                        outcome.append(1)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=buyer) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        variant.refresh_from_db()
+        self.assertEqual(len(reserved), 25)
+        self.assertEqual(len(rejected), attempts_per_thread * threads - 25)
+        self.assertEqual(variant.stock, 0)
+
+
+FEED_HEADER = "category_slug,category_name,product_title,product_description,sku,color,size,price,stock\n"
+
+
+class CatalogImportExportTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+    def run_import(self, text, fmt='csv', batch_size=2000):
+        return CatalogImporter(batch_size).run(read_rows(io.StringIO(text), fmt))
+
+    def test_import_creates_then_upserts_on_slug_and_sku(self):
+        result = self.run_import(FEED_HEADER + (
+            "tees,Tees,Basic Tee,Soft,TEE-S,Black,S,10.00,5\n"
+            "tees,Tees,Basic Tee,Soft,TEE-M,Black,M,10.00,7\n"
+            "bags,Bags,Tote,,BAG-1,,,25.5,1\n"
+        ), batch_size=2)
+        self.assertEqual(
+            (result.categories_created, result.products_created, result.variants_created), (2, 2, 3)
+        )
+        self.assertEqual(Product.objects.get(title='Basic Tee').variants.count(), 2)
+
+        result = self.run_import(FEED_HEADER + (
+            "tees,T-Shirts,Basic Tee,Soft,TEE-S,Black,S,12.00,5\n"
+            "tees,T-Shirts,Basic Tee,Soft,TEE-M,Black,M,10.00,7\n"
+            "tees,T-Shirts,Basic Tee,Soft,TEE-L,Black,L,10.00,3\n"
+        ))
+        self.assertEqual((result.variants_created, result.variants_updated, result.unchanged), (1, 1, 1))
+        self.assertEqual(Category.objects.get(slug='tees').name, 'T-Shirts')
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertEqual(ProductVariant.objects.get(sku='TEE-S').price, Decimal('12.00'))
+        self.assertEqual(Product.objects.get(title='Basic Tee').variants.count(), 3)
+
+    def test_unchanged_feed_makes_no_writes(self):
+        feed = FEED_HEADER + "tees,Tees,Basic Tee,Soft,TEE-S,Black,S,10.00,5\n"
+        self.run_import(feed)
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.run_import(feed)
+        self.assertEqual(result.unchanged, 1)
+        writes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(writes, [])
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        result = self.run_import(FEED_HEADER + (
+            "tees,Tees,Basic Tee,,,Black,S,10.00,5\n"
+            "tees,Tees,Basic Tee,,TEE-X,Black,S,free,5\n"
+            "tees,Tees,Basic Tee,,TEE-S,Black,S,10.00,5\n"
+        ))
+        self.assertEqual(result.variants_created, 1)
+        self.assertEqual(
+            result.errors,
+            [{'line': 2, 'error': 'sku is required'}, {'line': 3, 'error': 'price must be a number'}],
+        )
+
+    def test_out_of_range_values_are_row_errors(self):
+        result = self.run_import(FEED_HEADER + (
+            "tees,Tees,Basic Tee,,TEE-1,,,NaN,5\n"
+            "tees,Tees,Basic Tee,,TEE-2,,,Infinity,5\n"
+            "tees,Tees,Basic Tee,,TEE-3,,,123456789012.5,5\n"
+            "tees,Tees,Basic Tee,,TEE-4,,,-1,5\n"
+            "tees,Tees,Basic Tee,,TEE-5,,,10,-3\n"
+            f"tees,Tees,{'T' * 256},,TEE-6,,,10,5\n"
+            f"tees,Tees,Basic Tee,,TEE-7,{'c' * 51},,10,5\n"
+            f"tees,Tees,Basic Tee,,TEE-8,,{'s' * 51},10,5\n"
+            "tees,Tees,Basic Tee,,TEE-9,,,99999999.99,0\n"
+        ))
+        self.assertEqual([e['line'] for e in result.errors], [2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(result.errors[2]['error'], 'price must be below 100000000')
+        self.assertEqual(result.errors[4]['error'], 'stock must not be negative')
+        self.assertEqual(result.errors[5]['error'], 'product_title is longer than 255 characters')
+        self.assertEqual(list(ProductVariant.objects.values_list('sku', flat=True)), ['TEE-9'])
+        self.assertEqual(self.client.get('/api/products/products/').status_code, 200)
+
+    def test_import_invalidates_cart_summaries(self):
+        self.run_import(FEED_HEADER + "tees,Tees,Basic Tee,,TEE-S,,,10.00,5\n")
+        CartItem.objects.create(user=self.admin, variant=ProductVariant.objects.get(), quantity=2)
+        self.assertEqual(self.client.get('/api/products/cart/summary/').data['subtotal'], '20.00')
+        self.run_import(FEED_HEADER + "tees,Tees,Basic Tee,,TEE-S,,,12.50,5\n")
+        self.assertEqual(self.client.get('/api/products/cart/summary/').data['subtotal'], '25.00')
+
+    def test_import_invalidates_cached_product(self):
+        self.run_import(FEED_HEADER + "tees,Tees,Basic Tee,Soft,TEE-S,Black,S,10.00,5\n")
+        product = Product.objects.get()
+        self.assertEqual(self.client.get(f'/api/products/products/{product.id}/').data['variants'][0]['stock'], 5)
+        self.run_import(FEED_HEADER + "tees,Tees,Basic Tee,Soft,TEE-S,Black,S,10.00,9\n")
+        self.assertEqual(self.client.get(f'/api/products/products/{product.id}/').data['variants'][0]['stock'], 9)
+
+    def test_export_round_trips_through_import(self):
+        self.run_import(FEED_HEADER + "tees,Tees,Basic Tee,Soft,TEE-S,Black,S,10.00,5\nbags,Bags,Tote,,BAG-1,,,25.50,1\n")
+        response = self.client.get('/api/products/catalog/export/jsonl/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['sku'] for line in lines], ['TEE-S', 'BAG-1'])
+
+        result = self.run_import('\n'.join(lines), fmt='jsonl')
+        self.assertEqual(result.unchanged, 2)
+
+    def test_upload_and_command(self):
+        upload = SimpleUploadedFile('feed.csv', (FEED_HEADER + "tees,Tees,Basic Tee,,TEE-S,,,10,5\n").encode())
+        response = self.client.post('/api/products/catalog/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['variants_created'], 1)
+
+        out = io.StringIO()
+        call_command('export_catalog', '-', '--format', 'csv', stdout=out)
+        self.assertIn('TEE-S', out.getvalue())
+
+    def test_catalog_endpoints_are_admin_only(self):
+        self.client.force_authenticate(User.objects.create_user(
+            username='shopper', email='shopper@example.com', password='pass12345'
+        ))
+        self.assertEqual(self.client.get('/api/products/catalog/export/csv/').status_code, 403)
+        self.assertEqual(self.client.post('/api/products/catalog/import/', {}, format='multipart').status_code, 403)
@@ -1,9 +1,11 @@
 # products/urls.py
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from .views import (
     CategoryViewSet, ProductViewSet, ProductVariantViewSet,
-    CartViewSet, WishlistViewSet
+    CartViewSet, WishlistViewSet, ProductSearchView, CatalogExportView, CatalogImportView
 )
+from . import async_views
 
 router = DefaultRouter()
 router.register('categories', CategoryViewSet, basename='category')  # Added basename
@@ -12,4 +14,14 @@ router.register('variants', ProductVariantViewSet, basename='variant')  # Added
 router.register('cart', CartViewSet, basename='cart')
 router.register('wishlist', WishlistViewSet, basename='wishlist')
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path('search/', ProductSearchView.as_view(), name='product-search'),
+    # Bulk catalog feed (admin only)
+    path('catalog/export/<str:fmt>/', CatalogExportView.as_view(), name='catalog-export'),
+    path('catalog/import/', CatalogImportView.as_view(), name='catalog-import'),
+    # Async (ASGI-native) read endpoints
+    path('async/products/', async_views.product_list, name='async-product-list'),
+    path('async/products/<int:pk>/', async_views.product_detail, name='async-product-detail'),
+    path('async/categories/', async_views.category_list, name='async-category-list'),
+    path('async/cart/', async_views.cart_list, name='async-cart-list'),
+] + router.urls
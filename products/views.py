@@ -1,35 +1,74 @@
 # products/views.py
+import io
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.parsers import MultiPartParser
+from django.http import StreamingHttpResponse
+from core.mixins import ConditionalListMixin
+from .cache import catalog_cache
+from .catalog_io import FORMATS, CatalogImporter, encode, export_rows, format_for, read_rows
+from .cart import get_cart_summary, apply_cart_operations, increment_cart_items
+from .filters import ProductFilterBackend, product_facets
 from .models import Category, Product, ProductVariant, CartItem, WishlistItem
 from .serializers import (
     CategorySerializer, ProductSerializer, ProductVariantSerializer,
-    CartItemSerializer, WishlistSerializer
+    CartItemSerializer, WishlistSerializer, ProductSearchSerializer, CartBulkSerializer
 )
+from .search import search_products
 
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cursor_ordering = ('-id',)
     permission_classes = [IsAuthenticated]  # Require auth for all category operations
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
+    def retrieve(self, request, *args, **kwargs):
+        data = catalog_cache.get_or_set(
+            'category', kwargs['pk'], lambda: self.get_serializer(self.get_object()).data
+        )
+        return Response(data)
+
+class ProductViewSet(ConditionalListMixin, viewsets.ModelViewSet):
+    queryset = Product.objects.for_catalog()
     serializer_class = ProductSerializer
+    cursor_ordering = ('-created_at', '-id')
+    filter_backends = [ProductFilterBackend]
     permission_classes = [IsAuthenticated]  # Require auth for all product operations
 
+    def get_list_version(self, queryset):
+        # Bumped on every product, variant or category write; the ETag adds
+        # the filters and cursor from the path
+        return catalog_cache.list_version()
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['facets'] = product_facets(self.filter_queryset(self.get_queryset()))
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        data = catalog_cache.get_or_set(
+            'product', kwargs['pk'], lambda: self.get_serializer(self.get_object()).data
+        )
+        return Response(data)
+
 class ProductVariantViewSet(viewsets.ModelViewSet):
     queryset = ProductVariant.objects.all()
     serializer_class = ProductVariantSerializer
+    cursor_ordering = ('-id',)
     permission_classes = [IsAuthenticated]  # Require auth for all variant operations
 
 class CartViewSet(viewsets.ModelViewSet):
     serializer_class = CartItemSerializer
+    cursor_ordering = ('-added_at', '-id')
     permission_classes = [IsAuthenticated]
+    # Only needs request.user.id; skip resolving the User row
+    claims_only_actions = ('summary',)
 
     def get_queryset(self):
-        return CartItem.objects.filter(user=self.request.user)
+        return CartItem.objects.filter(user=self.request.user).select_related('variant')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -41,18 +80,25 @@ class CartViewSet(viewsets.ModelViewSet):
         variant = serializer.validated_data['variant']
         quantity = serializer.validated_data.get('quantity', 1)
         
-        cart_item, created = CartItem.objects.get_or_create(
-            user=request.user,
-            variant=variant,
-            defaults={'quantity': quantity}
-        )
-        
-        if not created:
-            cart_item.quantity += quantity
-            cart_item.save()
+        # Single upsert that increments in the database, safe against
+        # concurrent adds of the same variant
+        increment_cart_items(request.user.id, {variant.id: quantity})
+        cart_item = self.get_queryset().get(variant=variant)
             
         return Response(self.get_serializer(cart_item).data)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Add, set or remove many cart lines in one request"""
+        serializer = CartBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        apply_cart_operations(request.user.id, serializer.validated_data['items'])
+        return Response(get_cart_summary(request.user.id))
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        return Response(get_cart_summary(request.user.id))
+
     @action(detail=True, methods=['delete'])
     def remove(self, request, pk=None):
         try:
@@ -64,10 +110,13 @@ class CartViewSet(viewsets.ModelViewSet):
 
 class WishlistViewSet(viewsets.ModelViewSet):
     serializer_class = WishlistSerializer
+    cursor_ordering = ('-added_at', '-id')
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return WishlistItem.objects.filter(user=self.request.user)
+        return WishlistItem.objects.filter(user=self.request.user).select_related(
+            'product__category'
+        ).prefetch_related('product__variants')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -80,3 +129,51 @@ class WishlistViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Item removed from wishlist."})
         except WishlistItem.DoesNotExist:
             return Response({"detail": "Item not found in wishlist."}, status=status.HTTP_404_NOT_FOUND)
+
+class ProductSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = ProductSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        limit = filters.pop('limit')
+        products = search_products(**filters)[:limit]
+        return Response({'results': ProductSerializer(products, many=True).data})
+
+
+class CatalogExportView(APIView):
+    """Stream the whole catalog as CSV or JSONL (admin only)."""
+    permission_classes = [IsAdminUser]
+    content_types = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+    def get(self, request, fmt):
+        if fmt not in FORMATS:
+            return Response({"detail": f"Format must be one of {', '.join(FORMATS)}."}, status=status.HTTP_404_NOT_FOUND)
+        response = StreamingHttpResponse(encode(export_rows(), fmt), content_type=self.content_types[fmt])
+        response['Content-Disposition'] = f'attachment; filename="catalog.{fmt}"'
+        return response
+
+
+class CatalogImportView(APIView):
+    """
+    Upsert the catalog from an uploaded CSV/JSONL `file` (admin only). The
+    upload is read as a stream; large feeds are better run with the
+    `import_catalog` command than inside a request.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Upload the feed as `file`."}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('format') or format_for(upload.name)
+        if fmt not in FORMATS:
+            return Response({"detail": f"Format must be one of {', '.join(FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        try:
+            result = CatalogImporter().run(read_rows(stream, fmt))
+        except UnicodeDecodeError:
+            return Response({"detail": "The feed must be UTF-8."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict())
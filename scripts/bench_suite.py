@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Scripted load benchmark for the shop API. Virtual users repeatedly pick a
+scenario (weighted) and run it for DURATION seconds:
+
+    browse   GET product list, a product detail and the category list
+    cart     POST /cart/add/ for a random variant
+    checkout POST place_order (reserves stock and creates an order)
+    history  GET the user's order history
+
+Two modes:
+
+    --mode inprocess   Django test client, no server; measures the view
+                       stack and database only.
+    --mode server      Real HTTP against --base-url (runserver, gunicorn,
+                       uvicorn, ...) with keep-alive connections.
+
+Both modes use the configured database and write to it (carts, pending
+orders), so point DB_NAME at a disposable copy. Seed it first:
+
+    python manage.py seed_perf_data --users 1000 --products 5000 --orders 20000
+    python scripts/bench_suite.py --mode inprocess --concurrency 4 --duration 20 --output bench.json
+
+Tokens for the seeded users are minted locally, so login throttles are
+not involved. Results (throughput, p50/p95/p99 per scenario, git commit)
+are written as JSON for comparison between commits.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from products.models import Product, ProductVariant  # noqa: E402
+
+SCENARIOS = {'browse': 5, 'cart': 3, 'checkout': 1, 'history': 2}
+
+
+class InProcessTransport:
+    def __init__(self, token):
+        # The test client's default host is not in ALLOWED_HOSTS outside tests
+        self.client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def request(self, method, path, body=None):
+        if method == 'GET':
+            return self.client.get(path).status_code
+        return self.client.post(path, body or {}, content_type='application/json').status_code
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPTransport:
+    def __init__(self, token, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def request(self, method, path, body=None):
+        try:
+            self.conn.request(method, path, json.dumps(body or {}) if method != 'GET' else None, self.headers)
+            response = self.conn.getresponse()
+            response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                self.conn.close()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            return 0
+
+    def close(self):
+        self.conn.close()
+
+
+def run_scenario(name, transport, rng, product_ids, variant_ids):
+    """Returns the HTTP statuses of the requests the scenario made."""
+    if name == 'browse':
+        return [
+            transport.request('GET', '/api/products/products/'),
+            transport.request('GET', f'/api/products/products/{rng.choice(product_ids)}/'),
+            transport.request('GET', '/api/products/categories/'),
+        ]
+    if name == 'cart':
+        return [transport.request('POST', '/api/products/cart/add/', {'variant_id': rng.choice(variant_ids)})]
+    if name == 'checkout':
+        return [transport.request('POST', '/api/orders/orders/place_order/')]
+    return [transport.request('GET', '/api/orders/orders/')]
+
+
+def percentiles(latencies):
+    if len(latencies) < 2:
+        value = round(latencies[0], 2) if latencies else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(latencies, n=100)
+    return round(cuts[49], 2), round(cuts[94], 2), round(cuts[98], 2)
+
+
+def summarize(records, elapsed):
+    by_scenario = {}
+    for scenario, latency, ok in records:
+        by_scenario.setdefault(scenario, []).append((latency, ok))
+    result = {}
+    for scenario, rows in sorted(by_scenario.items()) + [('all', [(l, ok) for _, l, ok in records])]:
+        latencies = [latency for latency, _ in rows]
+        p50, p95, p99 = percentiles(latencies)
+        result[scenario] = {
+            'iterations': len(rows),
+            'errors': sum(1 for _, ok in rows if not ok),
+            'throughput_per_s': round(len(rows) / elapsed, 1),
+            'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+        }
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['inprocess', 'server'], default='inprocess')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000', help="Server mode target.")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--user-prefix', default='perf', help="Prefix used by seed_perf_data.")
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument('--output', help="Write results as JSON to this file.")
+    args = parser.parse_args()
+
+    users = list(get_user_model().objects.filter(
+        username__startswith=f'{args.user_prefix}_user_', is_active=True
+    ).order_by('id')[:args.concurrency])
+    product_ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:10000])
+    variant_ids = list(ProductVariant.objects.order_by('id').values_list('id', flat=True)[:10000])
+    if len(users) < args.concurrency or not variant_ids:
+        raise SystemExit("Not enough seeded data; run `manage.py seed_perf_data` first.")
+    connections.close_all()
+
+    weights = [SCENARIOS[name] for name in args.scenarios]
+    records, lock = [], threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def virtual_user(n, user):
+        token = str(AccessToken.for_user(user))
+        if args.mode == 'inprocess':
+            transport = InProcessTransport(token)
+        else:
+            transport = HTTPTransport(token, args.base_url)
+        rng = random.Random(args.seed + n)
+        local = []
+        try:
+            while time.perf_counter() < stop_at:
+                scenario = rng.choices(args.scenarios, weights)[0]
+                started = time.perf_counter()
+                statuses = run_scenario(scenario, transport, rng, product_ids, variant_ids)
+                ok = all(200 <= s < 300 for s in statuses)
+                local.append((scenario, (time.perf_counter() - started) * 1000, ok))
+        finally:
+            transport.close()
+        with lock:
+            records.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=virtual_user, args=(n, user)) for n, user in enumerate(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'mode': args.mode,
+        'base_url': args.base_url if args.mode == 'server' else None,
+        'concurrency': args.concurrency,
+        'duration_s': round(elapsed, 2),
+        'scenarios': summarize(records, elapsed),
+    }
+    for name, row in report['scenarios'].items():
+        print(
+            f"{name:<9} n={row['iterations']:<6} err={row['errors']:<4} {row['throughput_per_s']:>7}/s "
+            f"p50={row['p50_ms']}ms p95={row['p95_ms']}ms p99={row['p99_ms']}ms"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
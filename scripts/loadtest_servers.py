@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""
+Compare the async read endpoints under uvicorn (ASGI) with the DRF
+endpoints under gunicorn sync workers (WSGI).
+
+Each server is started as a subprocess against the configured database,
+driven by CONCURRENCY keep-alive client threads for DURATION seconds, and
+measured for throughput, latency percentiles and resident memory of its
+whole process tree. Memory per connection is (peak RSS - idle RSS) /
+concurrency.
+
+    python scripts/loadtest_servers.py --username alice --password secret \
+        --concurrency 50 --duration 20 --workers 2 --output loadtest.json
+
+Requires uvicorn and gunicorn to be installed; seed data first (for
+example with `manage.py seed_perf_data`) so the endpoints return real pages.
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+ASGI_PATHS = [
+    '/api/products/async/products/',
+    '/api/products/async/categories/',
+    '/api/products/async/cart/',
+    '/api/orders/async/orders/',
+]
+WSGI_PATHS = [
+    '/api/products/products/',
+    '/api/products/categories/',
+    '/api/products/cart/',
+    '/api/orders/orders/',
+]
+
+
+def server_command(kind, port, workers):
+    if kind == 'uvicorn':
+        return ['uvicorn', 'core.asgi:application', '--host', '127.0.0.1', '--port', str(port),
+                '--workers', str(workers), '--no-access-log']
+    return ['gunicorn', 'core.wsgi:application', '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers), '--worker-class', 'sync']
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+def tree_rss_kb(pid):
+    """Resident memory of a process and all of its descendants, from /proc."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total
+
+
+def login(port, username, password):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    body = json.dumps({'username': username, 'password': password})
+    conn.request('POST', '/api/accounts/login/', body, {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    data = json.loads(response.read() or b'{}')
+    if response.status != 200:
+        raise RuntimeError(f"Login failed ({response.status}): {data}")
+    return data['tokens']['access']
+
+
+def drive(port, paths, token, concurrency, duration):
+    headers = {'Authorization': f'Bearer {token}'}
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local, failed, i = [], 0, offset
+        while time.time() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+
+def run(kind, paths, args, token=None):
+    if shutil.which(kind) is None:
+        raise SystemExit(f"{kind} is not installed; pip install {kind}")
+    port = args.port + (1 if kind == 'gunicorn' else 0)
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='core.settings', PYTHONPATH=str(BASE_DIR))
+    proc = subprocess.Popen(server_command(kind, port, args.workers), cwd=BASE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        time.sleep(1)
+        token = token or login(port, args.username, args.password)
+        idle_kb = tree_rss_kb(proc.pid)
+
+        peak = {'kb': idle_kb}
+        sampling = threading.Event()
+
+        def sample():
+            while not sampling.is_set():
+                peak['kb'] = max(peak['kb'], tree_rss_kb(proc.pid))
+                time.sleep(0.25)
+
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+        started = time.time()
+        latencies, errors = drive(port, paths, token, args.concurrency, args.duration)
+        elapsed = time.time() - started
+        sampling.set()
+        sampler.join()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        'server': kind,
+        'paths': paths,
+        'workers': args.workers,
+        'concurrency': args.concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(cuts[49], 2),
+        'p95_ms': round(cuts[94], 2),
+        'p99_ms': round(cuts[98], 2),
+        'idle_rss_mb': round(idle_kb / 1024, 1),
+        'peak_rss_mb': round(peak['kb'] / 1024, 1),
+        'kb_per_connection': round((peak['kb'] - idle_kb) / args.concurrency, 1),
+    }, token
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--token', help="JWT access token; otherwise --username/--password are used to log in.")
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--servers', nargs='+', choices=['uvicorn', 'gunicorn'], default=['uvicorn', 'gunicorn'])
+    parser.add_argument('--output', help="Write results as JSON to this file.")
+    args = parser.parse_args()
+    if not args.token and not (args.username and args.password):
+        parser.error("pass --token or --username and --password")
+
+    results, token = [], args.token
+    for kind in args.servers:
+        result, token = run(kind, ASGI_PATHS if kind == 'uvicorn' else WSGI_PATHS, args, token)
+        results.append(result)
+        print(
+            f"{kind:<9} rps={result['throughput_rps']:<8} p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+            f"p99={result['p99_ms']}ms errors={result['errors']} rss idle/peak={result['idle_rss_mb']}/"
+            f"{result['peak_rss_mb']}MB per-conn={result['kb_per_connection']}KB"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    sys.exit(main())